@@ -1,5 +1,5 @@
 from django.contrib import admin
-from publications.models import Entry_Type, Publication
+from publications.models import Entry_Type, ImportJob, Publication
 
 ##################################################################
 
@@ -37,3 +37,27 @@ class PublicationOptions(admin.ModelAdmin):
 admin.site.register(Publication, PublicationOptions)
 
 ##################################################################
+
+
+class ImportJobOptions(admin.ModelAdmin):
+    list_display = [
+        "pk",
+        "owner",
+        "user",
+        "status",
+        "created",
+        "finished",
+        "total",
+        "created_count",
+        "updated_count",
+        "skipped_count",
+        "failed_count",
+    ]
+    list_filter = ["status"]
+    search_fields = ["owner__cn", "user__username"]
+    readonly_fields = ["errors"]
+
+
+admin.site.register(ImportJob, ImportJobOptions)
+
+##################################################################
@@ -15,6 +15,31 @@ class PublicationsConfig(AppConfig):
         Any app specific startup code, e.g., register signals,
         should go here.
         """
+        from django.core.signals import request_started, setting_changed
+        from django.db.models.signals import (
+            m2m_changed,
+            post_delete,
+            post_save,
+            pre_save,
+        )
+        from people.models import Person
+
+        from . import signals
+
+        Entry_Type = self.get_model("Entry_Type")
+        pre_save.connect(signals.entry_type_saving, sender=Entry_Type)
+        post_save.connect(signals.entry_type_saved, sender=Entry_Type)
+        post_delete.connect(signals.entry_type_deleted, sender=Entry_Type)
+        Publication = self.get_model("Publication")
+        post_save.connect(signals.publication_changed, sender=Publication)
+        post_delete.connect(signals.publication_changed, sender=Publication)
+        flags = Person._meta.get_field("flags")
+        for model in [Person, flags.remote_field.model]:
+            post_save.connect(signals.people_changed, sender=model)
+            post_delete.connect(signals.people_changed, sender=model)
+        m2m_changed.connect(signals.people_changed, sender=flags.remote_field.through)
+        request_started.connect(signals.request_started)
+        setting_changed.connect(signals.setting_changed)
 
 
 #########################################################################
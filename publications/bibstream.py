@@ -0,0 +1,117 @@
+"""
+Split a BibTeX file into entries without reading all of it.
+
+The file is read in chunks; only the entry being scanned (and the rest
+of the current chunk) is held in memory.  Each entry is yielded as text,
+for bibtexparser to parse on its own:
+
+    @type{...} and @type(...)   - entries, @string and @preamble included
+    braces                      - nest; an entry ends at its closing brace
+    "..."                       - quoted values may contain braces, and
+                                  unbalanced closing parentheses
+    @comment{...}               - skipped, as is any text between entries
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+import codecs
+import re
+
+###############
+
+CHUNK_SIZE = 64 * 1024
+
+# the start of an entry: "@type{" or "@type("
+ENTRY_START_RE = re.compile(r"@\s*([A-Za-z]+)\s*([{(])")
+
+# an entry start which might continue in the next chunk.
+PARTIAL_START_RE = re.compile(r"@\s*[A-Za-z]*\s*\Z")
+
+DELIMITER_RE = re.compile(r'[{}()"]')
+
+############################################################################
+
+
+def _read_text(fp, chunk_size):
+    """
+    Generate text chunks from a file opened in text or binary mode
+    (binary files are decoded as UTF-8).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        data = fp.read(chunk_size)
+        if not data:
+            break
+        if isinstance(data, bytes):
+            data = decoder.decode(data)
+        yield data
+    yield decoder.decode(b"", final=True)
+
+
+def iter_entries(fp, chunk_size=CHUNK_SIZE):
+    """
+    iter_entries(fp) -> generator of (entry type, text)
+
+    The entry type is lower case, e.g., "article" or "string".
+    An unterminated entry at the end of the file is yielded as is (and
+    left to the parser to complain about).
+    """
+    buffer = ""
+    entry = None  # (type, closing delimiter) of the entry being scanned
+    start = pos = depth = 0
+    in_quote = False
+    for chunk in _read_text(fp, chunk_size):
+        buffer += chunk
+        while True:
+            if entry is None:
+                at = buffer.find("@", pos)
+                if at < 0:
+                    # nothing but comments
+                    buffer = ""
+                    pos = 0
+                    break
+                match = ENTRY_START_RE.match(buffer, at)
+                if match is None:
+                    if PARTIAL_START_RE.match(buffer, at):
+                        # wait for more text
+                        buffer = buffer[at:]
+                        pos = 0
+                        break
+                    pos = at + 1
+                    continue
+                entry = (match.group(1).lower(), "}" if match.group(2) == "{" else ")")
+                start, pos = at, match.end()
+                depth = 0
+                in_quote = False
+
+            # scan the body of the entry.
+            entry_type, closing = entry
+            quotes = entry_type != "comment"
+            end = None
+            for match in DELIMITER_RE.finditer(buffer, pos):
+                c = match.group()
+                if c == '"':
+                    if quotes and depth == 0:
+                        in_quote = not in_quote
+                elif c == "{":
+                    depth += 1
+                elif c == "}" and depth > 0:
+                    depth -= 1
+                elif c == closing and depth == 0 and not in_quote:
+                    end = match.end()
+                    break
+            if end is None:
+                # wait for more text
+                pos = len(buffer)
+                break
+            if entry_type != "comment":
+                yield entry_type, buffer[start:end]
+            buffer = buffer[end:]
+            pos = 0
+            entry = None
+
+    if entry is not None and entry[0] != "comment":
+        yield entry[0], buffer[start:]
+
+
+############################################################################
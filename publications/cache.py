@@ -0,0 +1,136 @@
+"""
+Process-local caches for the publications app.
+
+Each local cache is tied to a version number kept in Django's cache
+framework (``publications:version:<namespace>``).  Invalidating a
+namespace bumps the shared version, so other worker processes notice
+the change the next time they consult it.
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+import time
+
+from django.core.cache import cache
+from django.template import Template
+
+###############
+
+VERSION_KEY = "publications:version:{0}"
+
+ENTRY_TYPES = "entry-types"
+PUBLICATIONS = "publications"
+PEOPLE = "people"
+
+############################################################################
+
+
+def _new_version():
+    """
+    A fresh version number, unlikely to collide with a previous one
+    (e.g., after the shared cache was cleared).
+    """
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    """
+    get_version(namespace) -> int
+
+    Return the shared version number for the given namespace.
+    """
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    """
+    Invalidate the given namespace in every process.
+    Returns the new version number.
+    """
+    key = VERSION_KEY.format(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # no shared version yet (or it was evicted)
+        version = _new_version()
+        cache.set(key, version, None)
+        return version
+
+
+############################################################################
+
+
+class CompiledTemplateCache(object):
+    """
+    Compiled Entry_Type templates, keyed by
+    (Entry_Type name, target, Entry_Type Last_Updated).
+
+    The shared version is only consulted on a miss, so a hit costs a
+    single dictionary lookup.  Since Last_Updated is part of the key,
+    an Entry_Type saved in another process can never produce a stale hit;
+    the version check is what frees the old entries.
+    """
+
+    namespace = ENTRY_TYPES
+
+    def __init__(self):
+        self._templates = {}
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, entry_type, target):
+        """
+        Return the compiled template for the given entry type and target.
+        """
+        key = (entry_type.Name, target, entry_type.Last_Updated)
+        try:
+            template = self._templates[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return template
+
+        self.misses += 1
+        self.sync()
+        template = Template(getattr(entry_type, "%s_Template" % target))
+        self._templates[key] = template
+        return template
+
+    def sync(self):
+        """
+        Drop everything if the shared version has moved.
+        """
+        version = get_version(self.namespace)
+        if version != self._version:
+            self._templates.clear()
+            self._version = version
+
+    def invalidate(self, entry_type=None):
+        """
+        Forget the templates for the given entry type (or all of them),
+        here and in every other process.
+        """
+        if entry_type is None:
+            self._templates.clear()
+        else:
+            for key in [k for k in self._templates if k[0] == entry_type.Name]:
+                self._templates.pop(key, None)
+        self._version = bump_version(self.namespace)
+
+    def stats(self):
+        """
+        Return a dictionary of hit/miss counters and the current size.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._templates)}
+
+
+template_cache = CompiledTemplateCache()
+
+############################################################################
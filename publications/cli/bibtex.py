@@ -2,42 +2,37 @@
 Generate BibTeX text for Publications.
 
 If no reference keys are given, then the result is the same behaviour
-as seen in the main publication view (Publication_ListView)
+as seen in the main publication view (PublicationListView)
 """
 #######################
 from __future__ import print_function, unicode_literals
 
-import codecs
-
-# set unicode piping:
-import sys
-
+#######################
 from ..models import Publication
-from ..views import Publication_ListView
+from ..views import PublicationListView
 
-#######################
 #######################################################################
 
 HELP_TEXT = __doc__.strip()
 DJANGO_COMMAND = "main"
-OPTION_LIST = ()
+USE_ARGPARSE = True
+OPTION_LIST = (
+    (["--url"], dict(action="store_true", help="Include the URL of each entry")),
+    (["args"], dict(nargs="*", metavar="reference-key")),
+)
 ARGS_USAGE = "[reference-key] [...]"
 
 #######################################################################
 
-sys.stdout = codecs.getwriter("utf-8")(sys.stdout)
-
-#######################################################################
-
 
 def main(options, args):
 
     if args:
-        queryset = Publication.objects.filter(pk__in=args)
+        queryset = Publication.objects.filter(Reference_Key__in=args)
     else:
-        queryset = Publication_ListView().get_queryset()
+        queryset = PublicationListView().get_queryset()
 
-    print("\n\n".join(queryset.as_bibtex()))
+    print(queryset.render("bibtex", include_url=options["url"], flat=True))
 
 
 #######################################################################
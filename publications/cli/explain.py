@@ -0,0 +1,112 @@
+"""
+Show the database's query plans for the publication list queries,
+and whether they use the indexes meant for them.
+
+The queries are those of the main page (the publications of the last
+few years) and of a personal page (the owner given by --owner, or else
+the owner with the most publications), one page long.  The exit status
+is 1 when any of them does not use its index.
+"""
+#######################
+from __future__ import print_function, unicode_literals
+
+import datetime
+import sys
+
+from django.db.models import Count
+from people.models import Person
+
+#######################
+from .. import conf
+from ..models import Publication
+
+#######################################################################
+
+HELP_TEXT = __doc__.strip()
+DJANGO_COMMAND = "main"
+USE_ARGPARSE = True
+OPTION_LIST = (
+    (["--owner"], dict(help="The owner (slug) for the personal page query")),
+    (
+        ["--verbose-plans"],
+        dict(action="store_true", help="Ask for the database's detailed plans"),
+    ),
+)
+
+#######################################################################
+
+
+def _get_owner(slug):
+    if slug:
+        return Person.objects.get(slug=slug)
+    return (
+        Person.objects.annotate(count=Count("publication"))
+        .filter(count__gt=0)
+        .order_by("-count")
+        .first()
+    )
+
+
+def _queries(owner):
+    """
+    Generate (label, query set, expected index name).
+    """
+    page_size = conf.get("list-page-size") or 50
+    since_year = datetime.date.today().year - conf.get("recent_years")
+    yield (
+        "main page",
+        Publication.objects.active()
+        .filter(Owner__active=True, year_int__gte=since_year)
+        .most_recent_order()
+        .public()[:page_size],
+        "pub_recent_public_idx",
+    )
+    if owner is not None:
+        yield (
+            "personal page ({0})".format(owner.slug),
+            Publication.objects.filter(Owner=owner)
+            .most_recent_order_with_key()
+            .active()[:page_size],
+            "pub_owner_key_idx",
+        )
+        yield (
+            "personal page, owner's view",
+            Publication.objects.filter(Owner=owner).most_recent_order_with_key()[
+                :page_size
+            ],
+            "pub_owner_key_idx",
+        )
+
+
+def check_plans(owner=None, **explain_options):
+    """
+    check_plans(owner=None, **explain_options) -> list
+
+    Returns (label, index name, whether it is used, plan) for each of the
+    list queries.
+    """
+    results = []
+    for label, qs, index in _queries(owner):
+        plan = qs.explain(**explain_options)
+        results.append((label, index, index in plan, plan))
+    return results
+
+
+def main(options, args):
+    owner = _get_owner(options["owner"])
+    explain_options = {}
+    if options["verbose_plans"]:
+        explain_options["verbose"] = True
+    results = check_plans(owner, **explain_options)
+    for label, index, used, plan in results:
+        print("{0}: {1} {2}".format(label, "uses" if used else "does NOT use", index))
+        for line in plan.splitlines():
+            print("    " + line)
+        print()
+    unused = [label for label, index, used, plan in results if not used]
+    if unused:
+        print("Not using their index: {0}".format(", ".join(unused)), file=sys.stderr)
+        sys.exit(1)
+
+
+#######################################################################
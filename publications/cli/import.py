@@ -0,0 +1,245 @@
+"""
+Import BibTeX files (or directories of .bib files).
+
+Files are parsed (and their LaTeX translated) in a pool of worker
+processes; the publications are written by this process.  The owner is
+given by --owner, or per file by --owner-from-file-map: a CSV file of
+"filename,owner-slug" rows, with filenames relative to the map file.
+
+Each batch is committed as it is written.  An interrupted import of a
+file resumes, when the file is imported again, after the last committed
+batch (unless --no-resume is given).
+"""
+#######################
+from __future__ import print_function, unicode_literals
+
+import csv
+import io
+import multiprocessing
+import os
+import sys
+import time
+
+import django
+from django.db import connections
+from people.models import Person
+
+#######################
+from ..models import Entry_Type, ImportCheckpoint, Publication, iter_bibtex_values
+from ..registry import entry_type_registry
+
+#######################################################################
+
+HELP_TEXT = __doc__.strip()
+DJANGO_COMMAND = "main"
+USE_ARGPARSE = True
+OPTION_LIST = (
+    (["--owner"], dict(help="The owner of the publications (slug)")),
+    (
+        ["--owner-from-file-map"],
+        dict(metavar="MAP.CSV", help="A CSV file of filename,owner-slug rows"),
+    ),
+    (
+        ["--workers"],
+        dict(
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of parsing processes (default: one per CPU)",
+        ),
+    ),
+    (
+        ["--no-overwrite"],
+        dict(
+            action="store_true",
+            help="Skip entries with the key of an existing publication",
+        ),
+    ),
+    (
+        ["--batch-size"],
+        dict(type=int, default=500, help="Number of publications per write"),
+    ),
+    (
+        ["--no-resume"],
+        dict(
+            action="store_true",
+            help="Start over, ignoring the checkpoints of interrupted imports",
+        ),
+    ),
+    (["args"], dict(nargs="*", metavar="FILE-OR-DIR")),
+)
+
+#######################################################################
+
+
+def _find_files(paths):
+    """
+    Generate the files named, and the .bib files in directories named.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith(".bib"):
+                    yield os.path.join(dirpath, filename)
+
+
+def _read_file_map(filename):
+    """
+    Returns a dictionary of real path -> owner slug.
+    """
+    base = os.path.dirname(os.path.abspath(filename))
+    file_map = {}
+    with io.open(filename, encoding="utf-8", newline="") as fp:
+        for row in csv.reader(fp):
+            if not row or row[0].startswith("#"):
+                continue
+            path, slug = [value.strip() for value in row[:2]]
+            file_map[os.path.realpath(os.path.join(base, path))] = slug
+    return file_map
+
+
+def _init_worker():
+    # (needed when worker processes are spawned rather than forked)
+    if not django.apps.apps.ready:
+        django.setup()
+
+
+def _parse_file(path):
+    """
+    Runs in a worker process.  Returns (path, size, entries, error).
+    """
+    try:
+        with io.open(path, "rb") as fp:
+            entries = list(iter_bibtex_values(fp))
+    except Exception as e:
+        return path, 0, [], "{0}: {1}".format(e.__class__.__name__, e)
+    return path, os.path.getsize(path), entries, None
+
+
+def main(options, args):
+    if bool(options["owner"]) == bool(options["owner_from_file_map"]):
+        print("Give exactly one of --owner or --owner-from-file-map.", file=sys.stderr)
+        return
+    paths = list(_find_files(args))
+    if not paths:
+        print("No files to import.", file=sys.stderr)
+        return
+
+    owners = {}
+    if options["owner"]:
+        slug_for = dict((path, options["owner"]) for path in paths)
+    else:
+        file_map = _read_file_map(options["owner_from_file_map"])
+        slug_for = {}
+        for path in paths:
+            try:
+                slug_for[path] = file_map[os.path.realpath(path)]
+            except KeyError:
+                print("{0}: not in the file map; skipped.".format(path))
+        paths = [path for path in paths if path in slug_for]
+    for slug in set(slug_for.values()):
+        try:
+            owners[slug] = Person.objects.get(slug=slug)
+        except Person.DoesNotExist:
+            print("No person with the slug {0!r}.".format(slug), file=sys.stderr)
+            return
+
+    start = time.time()
+    totals = dict(files=0, failed_files=0, size=0, entries=0)
+    counts = dict(created=0, updated=0, skipped=0, failed=0)
+
+    workers = max(1, options["workers"])
+    if workers == 1:
+        pool = None
+        results = map(_parse_file, paths)
+    else:
+        # worker processes must not share this process' connections.
+        connections.close_all()
+        pool = multiprocessing.Pool(workers, initializer=_init_worker)
+        results = pool.imap_unordered(_parse_file, paths)
+
+    try:
+        for path, size, entries, error in results:
+            totals["files"] += 1
+            if error is None:
+                try:
+                    entry_types = entry_type_registry.resolve(
+                        set(name for name, values in entries)
+                    )
+                except Entry_Type.DoesNotExist as e:
+                    error = str(e)
+            if error is None:
+                # (just before the import: identical files share a
+                #   checkpoint, which is deleted when one is done.)
+                try:
+                    with io.open(path, "rb") as fp:
+                        checkpoint = ImportCheckpoint.objects.for_file(
+                            owners[slug_for[path]], fp
+                        )
+                except (IOError, OSError) as e:
+                    error = str(e)
+                else:
+                    if options["no_resume"]:
+                        checkpoint.advance(0)
+            if error is not None:
+                totals["failed_files"] += 1
+                print("{0}: {1}".format(path, error))
+                continue
+
+            summary = Publication.objects.save_imported(
+                (
+                    Publication(Type=entry_types[name], **values)
+                    for name, values in entries
+                ),
+                owners[slug_for[path]],
+                overwrite=not options["no_overwrite"],
+                batch_size=options["batch_size"],
+                atomic=False,
+                checkpoint=checkpoint,
+            )
+            totals["size"] += size
+            totals["entries"] += len(summary)
+            for key in counts:
+                counts[key] += len(getattr(summary, key))
+            print("{0}: {1}".format(path, summary))
+            for key, reason in summary.failed:
+                print("    {0}: {1}".format(key, reason))
+            for key, other in summary.duplicates:
+                print(
+                    "    {0}: possible duplicate of {1} ({2})".format(
+                        key, other.Reference_Key, other.Owner
+                    )
+                )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = max(time.time() - start, 1e-6)
+    print(
+        "{files} file(s) ({failed_files} failed), {entries} entries, "
+        "{size:.2f} MB".format(
+            files=totals["files"],
+            failed_files=totals["failed_files"],
+            entries=totals["entries"],
+            size=totals["size"] / 1e6,
+        )
+    )
+    print(
+        "{created} created, {updated} updated, {skipped} skipped, "
+        "{failed} failed".format(**counts)
+    )
+    print(
+        "{0:.2f}s with {1} worker(s): {2:.1f} entries/s, {3:.3f} MB/s".format(
+            elapsed,
+            workers,
+            totals["entries"] / elapsed,
+            totals["size"] / 1e6 / elapsed,
+        )
+    )
+
+
+#######################################################################
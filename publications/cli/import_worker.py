@@ -0,0 +1,79 @@
+"""
+Process queued BibTeX uploads (import jobs).
+
+Runs until interrupted, checking for new jobs every few seconds;
+with --once, exits when there is nothing left to do.  With --requeue,
+jobs left running (by a worker which was stopped) or failed are run
+again, resuming after their last committed batch.
+"""
+#######################
+from __future__ import print_function, unicode_literals
+
+import time
+
+from django.db import close_old_connections
+
+#######################
+from ..models import ImportJob
+from ..registry import entry_type_registry
+
+#######################################################################
+
+HELP_TEXT = __doc__.strip()
+DJANGO_COMMAND = "main"
+USE_ARGPARSE = True
+OPTION_LIST = (
+    (
+        ["--once"],
+        dict(action="store_true", help="Exit when there are no more queued jobs"),
+    ),
+    (
+        ["--requeue"],
+        dict(
+            action="store_true",
+            help="First requeue running and failed jobs (stop any other workers)",
+        ),
+    ),
+    (
+        ["--sleep"],
+        dict(type=float, default=5, help="Seconds to wait between checks for jobs"),
+    ),
+    (
+        ["--batch-size"],
+        dict(type=int, default=500, help="Number of publications per write"),
+    ),
+)
+
+#######################################################################
+
+
+def main(options, args):
+    if options["requeue"]:
+        print("Requeued {0} job(s).".format(ImportJob.objects.requeue()))
+    while True:
+        # as at the start of a request: notice changed Entry_Types (e.g.,
+        #   templates), and drop broken or expired connections.
+        entry_type_registry.expire()
+        close_old_connections()
+        job = ImportJob.objects.claim()
+        if job is None:
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+            continue
+        print("Starting {0}.".format(job))
+        job.run(batch_size=options["batch_size"])
+        print(
+            "{0}: {1} created, {2} updated, {3} skipped, {4} failed.".format(
+                job,
+                job.created_count,
+                job.updated_count,
+                job.skipped_count,
+                job.failed_count,
+            )
+        )
+        if job.message:
+            print(job.message)
+
+
+#######################################################################
@@ -0,0 +1,106 @@
+"""
+Compare the throughput of LaTeX to Unicode translation: bibtexparser's
+latex_to_unicode versus the compiled translator used on import.
+
+Field values are taken from the given BibTeX files; with no files, a
+built-in sample of typical values is used.
+"""
+#######################
+from __future__ import print_function, unicode_literals
+
+import io
+import timeit
+
+#######################
+from ..latexenc import LatexTranslator
+
+#######################################################################
+
+HELP_TEXT = __doc__.strip()
+DJANGO_COMMAND = "main"
+USE_ARGPARSE = True
+OPTION_LIST = (
+    (
+        ["--repeat"],
+        dict(type=int, default=5, help="Number of timed runs (the best is reported)"),
+    ),
+    (
+        ["--copies"],
+        dict(
+            type=int,
+            default=100,
+            help="Number of copies of the sample values to translate per run",
+        ),
+    ),
+    (["args"], dict(nargs="*", help="BibTeX files to take field values from")),
+)
+
+SAMPLE_VALUES = [
+    "M\\\"{u}ller, J{\\\"o}rg and Erd{\\H{o}}s, Paul and Nov\\'{a}k, Ji\\v{r}\\'{\\i}",
+    "On the {B}ayesian analysis of $\\alpha$-stable processes",
+    "Ann. Inst. H. Poincar\\'e Probab. Statist.",
+    'Estimation of \\(\\sigma^2\\) in na\\"{\\i}ve models -- a \\$5 survey',
+    "Pis\\cprime ma v {Z}h. \\`{E}ksper. Teoret. Fiz.",
+    "A note on the {P}\\'olya urn, with applications to {M}arkov chains",
+    "123--145",
+    "Springer-Verlag",
+]
+
+#######################################################################
+
+
+def _load_values(filenames):
+    from bibtexparser.bparser import BibTexParser
+
+    values = []
+    for filename in filenames:
+        with io.open(filename, encoding="utf-8") as fp:
+            parser = BibTexParser(common_strings=True)
+            database = parser.parse_file(fp)
+        for entry in database.entries:
+            values.extend(v for k, v in entry.items() if k not in ["ID", "ENTRYTYPE"])
+    return values
+
+
+def _per_value(values, func):
+    def run():
+        for value in values:
+            func(value)
+
+    return run
+
+
+def main(options, args):
+    from bibtexparser.latexenc import latex_to_unicode
+
+    if args:
+        values = _load_values(args)
+    else:
+        values = SAMPLE_VALUES * options["copies"]
+    size = sum(len(value) for value in values)
+    print(
+        "{0} value(s), {1} character(s); best of {2} run(s).".format(
+            len(values), size, options["repeat"]
+        )
+    )
+
+    translator = LatexTranslator()
+    candidates = [
+        ("bibtexparser latex_to_unicode", latex_to_unicode),
+        ("compiled translator", translator.translate),
+        ("compiled translator (math mode)", translator),
+    ]
+    # the compiled tables are built once per process; not part of the timing.
+    translator.translate("\\relax")
+    for label, func in candidates:
+        best = min(
+            timeit.repeat(_per_value(values, func), number=1, repeat=options["repeat"])
+        )
+        print(
+            "{0:32} {1:9.4f}s {2:12.0f} values/s {3:8.2f} MB/s".format(
+                label, best, len(values) / best, size / best / 1e6
+            )
+        )
+
+
+#######################################################################
@@ -0,0 +1,54 @@
+"""
+Rebuild the stored renderings (HTML, LaTeX and BibTeX) of publications.
+
+Saving a publication or an entry type already does this; run this after
+changing settings which affect rendering (e.g., inline-math-mode-rewrite)
+or to fill in publications saved before the renderings were stored.
+With --stale, only publications without stored renderings are done
+(e.g., those of an entry type with more than rerender-limit publications,
+whose templates were changed).
+"""
+#######################
+from __future__ import print_function, unicode_literals
+
+#######################
+from ..models import Publication
+
+#######################################################################
+
+HELP_TEXT = __doc__.strip()
+DJANGO_COMMAND = "main"
+USE_ARGPARSE = True
+OPTION_LIST = (
+    (["--owner"], dict(help="Restrict to a particular owner (slug)")),
+    (["--type"], dict(help="Restrict to a particular entry type (name)")),
+    (
+        ["--stale"],
+        dict(action="store_true", help="Only those without stored renderings"),
+    ),
+    (
+        ["--batch-size"],
+        dict(type=int, default=500, help="Number of publications per update"),
+    ),
+)
+
+#######################################################################
+
+
+def main(options, args):
+    qs = Publication.objects.all()
+
+    if options["owner"]:
+        qs = qs.filter(Owner__slug=options["owner"])
+
+    if options["type"]:
+        qs = qs.filter(Type__Name=options["type"])
+
+    if options["stale"]:
+        qs = qs.filter(rendered_html__isnull=True)
+
+    count = qs.rerender(batch_size=options["batch_size"])
+    print("{0} publication(s) rerendered.".format(count))
+
+
+#######################################################################
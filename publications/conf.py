@@ -18,10 +18,67 @@ DEFAULT = {
     # re-write $...$ as \(...\)
     "inline-math-mode-rewrite": False,
     "preserve-math-mode": True,
+    # seconds to keep rendered publication lists in the cache
+    "list-cache-timeout": 60 * 60,
+    # seconds to keep a user's person and publications flag in the cache
+    #   (0 to look them up on every request)
+    "auth-cache-timeout": 60,
+    # publications per page of a list (0 for all of them on one page)
+    "list-page-size": 50,
+    # seconds browsers may keep the (versioned) publication form schema
+    "form-schema-max-age": 365 * 24 * 60 * 60,
+    # people per page of the sitemap (the sitemap index lists the pages)
+    "sitemap-page-size": 1000,
+    # publications re-rendered when their entry type's templates change;
+    #   beyond this, their stored renderings are dropped (and rendered when
+    #   shown) until "publications rerender --stale" is run
+    "rerender-limit": 1000,
+    # queue BibTeX uploads for the import_worker command,
+    #   instead of importing them during the upload request.
+    #   Only turn this on with a worker running: queued uploads wait for it.
+    "async-import": False,
 }
 
+from collections import namedtuple
+
 from django.conf import settings
 
+# setting names as attribute names, e.g., "preserve-math-mode" -> "preserve_math_mode"
+ATTRIBUTE_NAMES = dict((setting, setting.replace("-", "_")) for setting in DEFAULT)
+
+Snapshot = namedtuple("Snapshot", sorted(ATTRIBUTE_NAMES.values()))
+
+_snapshot = None
+
+
+def snapshot():
+    """
+    snapshot() -> Snapshot
+
+    Return the current settings as an immutable object with attribute
+    access, e.g., ``snapshot().recent_count``.  The snapshot is built once,
+    and rebuilt only after reset() (i.e., when Django's setting_changed
+    signal fires for CONFIG_NAME).
+    """
+    global _snapshot
+    if _snapshot is None:
+        app_settings = getattr(settings, CONFIG_NAME, DEFAULT)
+        _snapshot = Snapshot(
+            **dict(
+                (ATTRIBUTE_NAMES[setting], app_settings.get(setting, DEFAULT[setting]))
+                for setting in DEFAULT
+            )
+        )
+    return _snapshot
+
+
+def reset():
+    """
+    Forget the current snapshot.
+    """
+    global _snapshot
+    _snapshot = None
+
 
 def get(setting):
     """
@@ -30,16 +87,18 @@ def get(setting):
     setting should be a string representing the application settings to
     retrieve.
     """
-    assert setting in DEFAULT, "the setting %r has no default value" % setting
-    app_settings = getattr(settings, CONFIG_NAME, DEFAULT)
-    return app_settings.get(setting, DEFAULT[setting])
+    try:
+        name = ATTRIBUTE_NAMES[setting]
+    except KeyError:
+        raise AssertionError("the setting %r has no default value" % setting)
+    return getattr(snapshot(), name)
 
 
 def get_all():
     """
     Return all current settings as a dictionary.
     """
-    app_settings = getattr(settings, CONFIG_NAME, DEFAULT)
+    current = snapshot()
     return dict(
-        [(setting, app_settings.get(setting, DEFAULT[setting])) for setting in DEFAULT]
+        [(setting, getattr(current, ATTRIBUTE_NAMES[setting])) for setting in DEFAULT]
     )
@@ -5,18 +5,22 @@ Forms for the publications app.
 from __future__ import print_function, unicode_literals
 
 #######################
+import hashlib
+import json
 from collections import OrderedDict
 
 from django import forms
 from django.conf import settings
+from django.db import transaction
 from django.forms import widgets
+from django.urls import reverse
 from django.utils.html import escape
-from django.utils.safestring import mark_safe
 from people.models import Person
 
-from .models import HELP_TEXT, Entry_Type, Publication
+from .models import HELP_TEXT, Entry_Type, ImportJob, Publication
+from .registry import entry_type_registry
 
-# NOTE: The generated javascript defies the regular expectation:
+# NOTE: The form's javascript defies the regular expectation:
 #   when an Entry_Type is changed, the errors don't go away
 #   which is the expected behaviour when trying to correct
 #   your mistakes.
@@ -161,6 +165,7 @@ class PublicationForm(forms.Form):
         """
 
         css = {"all": ("css/forms.css",)}
+        js = ("publications/js/publication_form.js",)
 
     class clean_bibtex_field:
         def __init__(self, name, form, is_uint=False):
@@ -212,9 +217,11 @@ class PublicationForm(forms.Form):
     def clean_Entry_Type(self):
         name = self.data["Entry_Type"]
         try:
-            self.entry_type = Entry_Type.objects.get(Active=True, Name=name)
+            self.entry_type = entry_type_registry.get(name)
         except Entry_Type.DoesNotExist:
             self.entry_type = None
+        if self.entry_type is None or not self.entry_type.Active:
+            self.entry_type = None
             raise forms.ValidationError("This is an invalid entry type.")
 
         return self.data["Entry_Type"]
@@ -240,82 +247,66 @@ class PublicationForm(forms.Form):
             data[b] = (b in self.data) and bool(self.data[b])
         return data
 
-    def javascript(self):
-        result = ""
-        result += """function set_row_display(name, show)
-{
-    var elem_input = document.getElementById('id_' + name);
-    var elem = elem_input.parentNode.parentNode;
-    if (elem)
-    {
-        if (show)
-        {
-            elem.style.display = '';
-        }
-        else
-        {
-            elem.style.display = 'none';
+    @classmethod
+    def schema(cls):
+        """
+        The form's show/hide rules and help text for each active
+        Entry_Type, for publication_form.js.
+        """
+        types = OrderedDict()
+        for et in entry_type_registry.active():
+            # note: the type is identified by its primary key (Name, a slug).
+            fields = [
+                (field, "(Optional) " + HELP_TEXT[field])
+                for field in et.get_optional_field_list()
+            ]
+            fields += [
+                (field, "(Required) " + HELP_TEXT[field])
+                for field in et.get_required_field_list()
+            ]
+            types[et.Name] = {
+                "description": escape(et.Description),
+                "fields": fields,
+                "show": ["URL", "Active", "public"],
+            }
+        return {
+            "hide": cls.initial_hide_list,
+            "help": escape(HELP_TEXT["Type"]),
+            "types": types,
         }
-    }
-}
 
-"""
-        result += "function set_help_text(name, text)\n{\n"
-        result += "    var obj = document.getElementById('help-text-' + name);\n"
-        result += "    if (obj) {\n"
-        result += "        obj.innerHTML = text;\n"
-        result += "    }\n"
-        result += "}\n\n"
-
-        result += "function hideAll()\n{\n"
-        result += "\n".join(
-            ["    set_row_display('%s', false);" % e for e in self.initial_hide_list]
+    @classmethod
+    def schema_version(cls):
+        """
+        schema_version() -> string
+
+        Changes whenever an Entry_Type is saved (its Last_Updated), added
+        or deleted.
+        """
+        return hashlib.md5(
+            "\n".join(
+                "{0}:{1}".format(et.Name, et.Last_Updated.isoformat())
+                for et in entry_type_registry.all()
+            ).encode("utf-8")
+        ).hexdigest()[:12]
+
+    @classmethod
+    def schema_javascript(cls):
+        """
+        schema_javascript() -> string
+        """
+        return "var publicationFormSchema = {0};\n".format(
+            json.dumps(cls.schema(), separators=(",", ":"))
         )
-        result += "\n"
-        result += "}\n\n"
-
-        result += "function onTypeChange()\n{\n"
-        result += "    set_help_text('Entry_Type', '%s');\n" % escape(HELP_TEXT["Type"])
-        result += "    hideAll();\n"
-        result += """    var type_selector = document.getElementById('id_Entry_Type');
-    type_selector_index = type_selector.selectedIndex;
-    type_id = -1;
-    for (var i = 0; i < type_selector.options.length; i++) {
-        if (type_selector.options[i].selected == true) {
-            type_id = type_selector.options[i].value;
-            break
-        }
-    }
-"""
-        # note: the "type_id" is the primary_key (a slug), to the Entry_Type object.
-        for et in Entry_Type.objects.filter(Active=True):
-            result += "    if (type_id == '%s') {\n" % et.Name
-            result += "        set_help_text('%s', '%s');\n" % (
-                "Entry_Type",
-                escape(et.Description),
-            )
-            for field in et.get_optional_field_list():
-                result += "        set_row_display('%s', true);\n" % field
-                result += "        set_help_text('%s', '%s');\n" % (
-                    field,
-                    "(Optional) " + HELP_TEXT[field],
-                )
-            for field in et.get_required_field_list():
-                result += "        set_row_display('%s', true);\n" % field
-                result += "        set_help_text('%s', '%s');\n" % (
-                    field,
-                    "(Required) " + HELP_TEXT[field],
-                )
-            for name in ["URL", "Active", "public"]:
-                result += "        set_row_display('%s', true);\n" % name
-            result += "    }\n"
-        result += "\n}\n\n"
 
-        result += "function publicationsOnLoad()\n{\n"
-        result += "    hideAll();\n"
-        result += "    onTypeChange();\n"
-        result += "}\n\n"
-        return mark_safe(result)
+    def schema_url(self):
+        """
+        The (versioned) URL of schema_javascript(); use with
+        {{ form.media }} in templates.
+        """
+        return reverse(
+            "publications-form-schema", kwargs={"version": self.schema_version()}
+        )
 
 
 class BibtexUploadForm(forms.Form):
@@ -362,9 +353,23 @@ class BibtexUploadForm(forms.Form):
             self.fields = fields
         return result
 
+    def enqueue(self, owner, user=None):
+        """
+        Queue the uploaded file for the import_worker command.
+        Returns the ImportJob.
+        """
+        return ImportJob.objects.create(
+            owner=owner,
+            user=user,
+            file=self.files["file"],
+            overwrite="overwrite" in self.data,
+        )
+
     def save_bibtex(self, owner):
         """
         Worker function for actually processing the BibTeX file.
+        The upload is imported entirely, or (when any entry fails) not at
+        all.
 
         Returns True if successful and False if the processing fails.
         """
@@ -375,37 +380,32 @@ class BibtexUploadForm(forms.Form):
             self._errors[forms.forms.NON_FIELD_ERRORS] = self.error_class([message])
             return False
 
-        def _safe_int_uniq(v):
-            try:
-                v = int(v)
-            except ValueError:
-                v = 0
-            return v
-
         overwrite = "overwrite" in self.data
 
-        pub_list = Publication.objects.load_from_bibtex(self.files["file"].read())
-        if not pub_list:
+        try:
+            with transaction.atomic():
+                self.summary = Publication.objects.save_imported(
+                    Publication.objects.iter_from_bibtex(self.files["file"]),
+                    owner,
+                    overwrite=overwrite,
+                )
+                if self.summary.failed:
+                    # fix the file and upload it again, rather than half of it.
+                    transaction.set_rollback(True)
+        except Entry_Type.DoesNotExist as e:
+            return error(str(e))
+        if not self.summary:
             return error("No entries found.  Is this a BibTeX file?")
-
-        for pub in pub_list:
-            refkey = pub.Reference_Key
-            try:
-                original = Publication.objects.get(Reference_Key=refkey, Owner=owner)
-            except Publication.DoesNotExist:
-                # no prior publication with this key for this owner.
-                pub.Owner = owner
-                pub.save()
-            else:
-                # original exists; overwrite values?
-                if overwrite:
-                    values = pub.__dict__
-                    for key in values:
-                        if key != "id":
-                            setattr(original, key, values[key])
-                    original.Owner = owner
-                    original.save()
-
+        if self.summary.failed:
+            return error(
+                "Nothing was imported: fix these entries, and upload the "
+                "file again: {0}".format(
+                    "; ".join(
+                        "{0} ({1})".format(key, reason)
+                        for key, reason in self.summary.failed
+                    ),
+                )
+            )
         return True
 
 
@@ -0,0 +1,154 @@
+"""
+LaTeX to Unicode translation for imported BibTeX values.
+
+bibtexparser's ``latex_to_unicode`` tries each of its ~2500 macros in turn
+with ``str.replace``.  Here the same tables (plus a few Cyrillic
+transliterations) are compiled, once per process, into a single regular
+expression; each value is scanned once for macros, once for the
+remaining accent commands, and math mode (``$...$``, ``\\(...\\)``, with
+``\\$`` as a literal dollar) is found in the same pass that splits the
+value into text and math segments.
+
+Where several macros could match at the same position, the longest one
+wins (e.g., ``\\uparrow`` is an arrow, not a breve over "parrow").
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+import itertools
+import re
+import unicodedata
+
+###############
+
+# Cyrillic transliterations which bibtexparser does not provide.
+CYRILLIC = {
+    "\\cprime": "ь",  # "soft sign"
+    "\\cdprime": "ъ",  # "hard sign"
+    "\\u{i}": "й",  # "i-kratkaya"
+    '\\"{e}': "ё",  # "yoh"
+    "\\`{e}": "э",  # "e-oborotnoye"
+    "\\`{E}": "Э",  # "E-oborotnoye"
+}
+
+# math mode delimiters, and the escaped dollar sign (which is not one,
+#   but must not be mistaken for one).
+MATH_RE = re.compile(r"\\\$|\\\(|\\\)|\$")
+
+BRACES = dict.fromkeys(map(ord, "{}"))
+
+############################################################################
+
+
+class LatexTranslator(object):
+    """
+    Translate LaTeX markup to Unicode; see latex_unicode_fixes().
+
+    The tables are compiled on first use, so importing this module does
+    not require bibtexparser.
+    """
+
+    def __init__(self):
+        self._macro_re = None
+
+    def _compile(self):
+        from bibtexparser.latexenc import (
+            unicode_to_crappy_latex1,
+            unicode_to_crappy_latex2,
+            unicode_to_latex,
+        )
+
+        # the first entry for a macro wins, as with sequential replacement.
+        table = {}
+        for unicod, latex in itertools.chain(
+            unicode_to_crappy_latex1, unicode_to_latex
+        ):
+            latex = latex.rstrip()
+            if latex and latex not in table:
+                table[latex] = unicod
+        for latex, unicod in CYRILLIC.items():
+            table.setdefault(latex, unicod)
+
+        # accent macros apply to the following character.
+        accents = set(
+            latex
+            for latex, unicod in table.items()
+            if len(unicod) == 1 and unicodedata.combining(unicod)
+        )
+        patterns = [(len(latex) + (latex in accents), latex) for latex in table]
+        patterns.sort(key=lambda item: item[0], reverse=True)
+        alternatives = [
+            re.escape(latex) + ("(?:.|\\Z)" if latex in accents else "")
+            for length, latex in patterns
+        ]
+        self._table = table
+        self._accents = accents
+        self._accent_re = re.compile(
+            "(%s)(.?)"
+            % "|".join(
+                re.escape(latex.rstrip()) for u, latex in unicode_to_crappy_latex2
+            ),
+            re.DOTALL,
+        )
+        self._accent_table = dict(
+            (latex.rstrip(), unicod) for unicod, latex in unicode_to_crappy_latex2
+        )
+        self._macro_re = re.compile("|".join(alternatives), re.DOTALL)
+
+    def _replace_macro(self, match):
+        text = match.group()
+        try:
+            return self._table[text]
+        except KeyError:
+            # an accent macro, and the character it applies to.
+            return text[-1] + self._table[text[:-1]]
+
+    def _replace_accent(self, match):
+        latex, following = match.groups()
+        if not following:
+            return ""
+        return following + self._accent_table[latex]
+
+    def translate(self, s):
+        """
+        Translate a value which has no math mode in it.
+        """
+        if self._macro_re is None:
+            self._compile()
+        # (an escaped dollar sign alone does not count as markup.)
+        if "{" in s or s.count("\\") > s.count("\\$"):
+            s = self._macro_re.sub(self._replace_macro, s)
+        # Remove any left braces
+        s = s.translate(BRACES)
+        if "\\" in s:
+            s = self._accent_re.sub(self._replace_accent, s)
+        return unicodedata.normalize("NFC", s)
+
+    def __call__(self, s, preserve_math_mode=True):
+        """
+        Translate s, leaving math mode untouched if preserve_math_mode.
+        """
+        if not preserve_math_mode or (
+            "$" not in s and "\\(" not in s and "\\)" not in s
+        ):
+            return self.translate(s)
+        result = []
+        math_mode = False
+        start = 0
+        for match in MATH_RE.finditer(s):
+            if match.group() == "\\$":
+                # a literal dollar sign stays in its segment.
+                continue
+            text = s[start : match.start()]
+            result.append(text if math_mode else self.translate(text))
+            result.append(match.group())
+            start = match.end()
+            math_mode = not math_mode
+        text = s[start:]
+        result.append(text if math_mode else self.translate(text))
+        return "".join(result)
+
+
+translator = LatexTranslator()
+
+############################################################################
@@ -0,0 +1,254 @@
+"""
+The (very) simplified markup used in publication fields:
+
+    \\* \\{ \\} \\\\    - escaped literals
+    *italics*
+    **bold**
+    {Protect} {C}ase    - from BibTeX
+    $...$ \\( \\)       - math mode (braces are kept, see below)
+
+Field values are split by a compiled regular expression into runs of
+plain text and single special characters; ``parse()`` turns those tokens
+into a small tree of ``Node`` objects, which ``render()`` emits for a
+target.  Plain text runs are never looked at character by character.
+
+The parser reproduces the historical per-character state machine
+exactly, including its quirks (e.g., a dangling ``*`` or ``\\`` at the end
+of a value is dropped, and ``}`` outside of math mode is skipped), since
+stored data has been written against it.
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+import re
+from collections import namedtuple
+
+from django.utils import six
+
+from . import conf
+
+###############
+
+# runs of plain text, or a single special character.
+TOKEN_RE = re.compile(r"[^\\$*{}]+|[\\$*{}]")
+
+SPECIALS = frozenset("\\$*{}")
+
+NORMAL = "normal"
+ITALIC = "italic"
+BOLD = "bold"
+PROTECT_CASE = "protect_case"
+
+# A node of the parse tree.  ``children`` is a list of strings and Nodes.
+Node = namedtuple("Node", ["state", "children"])
+
+# format strings for each target; protect_case is rendered as its contents.
+EMITTERS = {
+    "html": {ITALIC: "<i>%s</i>", BOLD: "<b>%s</b>"},
+    "latex": {ITALIC: "\\textit{%s}", BOLD: "\\textbf{%s}"},
+}
+
+LATEX_SPECIALS = ["&", "#"]
+
+############################################################################
+
+
+def _next_state(c, state, math_mode):
+    """
+    The state transition for character c.  Returns None for no change.
+    States starting with "?" need a look-ahead at the next character.
+    """
+    if state == "?ESCAPE?":
+        if c in ["*", "{", "}", "\\"]:
+            return "ESCAPE"
+        if c in ["(", ")", "[", "]"]:
+            return "MATH-DELIM"
+        return None
+
+    if c == "\\":
+        return "?ESCAPE?"
+
+    if c == "$":
+        return "MATH-DELIM"
+
+    if c == "{":
+        if state == PROTECT_CASE or not math_mode:
+            return PROTECT_CASE
+        return "brace_match"
+
+    if c == "}":
+        if math_mode:
+            return "STOP:brace_match"
+        if state == PROTECT_CASE:
+            return "STOP:protect_case"
+        return "SKIP"
+
+    if c == "*":
+        if state == "?italic?":
+            return BOLD
+        if state == BOLD:
+            return "?not-bold?"
+        if state == "?not-bold?":
+            return "STOP:bold"
+        if state == ITALIC:
+            return "STOP:italic"
+        return "?italic?"
+
+    if state == "?italic?":
+        return ITALIC
+    if state == "?not-bold?":
+        return ITALIC
+    return None
+
+
+# The full transition table: (special, state, math_mode) -> new state.
+TRANSITIONS = dict(
+    ((c, state, math_mode), _next_state(c, state, math_mode))
+    for c in SPECIALS
+    for state in [NORMAL, ITALIC, BOLD, PROTECT_CASE]
+    for math_mode in [False, True]
+)
+
+# Look-ahead characters that matter; any other character acts like "a".
+PEEK_CHARS = "\\$*{}()[]"
+
+PEEK_TRANSITIONS = dict(
+    ((c, state, math_mode), _next_state(c, state, math_mode))
+    for c in PEEK_CHARS + "a"
+    for state in ["?ESCAPE?", "?italic?", "?not-bold?"]
+    for math_mode in [False, True]
+)
+
+NESTING_STATES = frozenset([BOLD, ITALIC, PROTECT_CASE])
+
+
+def parse(value, preserve_math_mode=True):
+    """
+    parse(value) -> list
+
+    Returns the parse tree for the value: a list of strings and Nodes.
+    """
+    tokens = TOKEN_RE.findall(value)
+    count = len(tokens)
+    root = []
+    stack = []
+    state, children, fragment = NORMAL, root, []
+    in_math_mode = False
+    pos = 0
+
+    while pos < count:
+        c = tokens[pos]
+        if c not in SPECIALS:
+            fragment.append(c)
+            pos += 1
+            continue
+
+        new_state = TRANSITIONS[c, state, in_math_mode]
+        if new_state[0] == "?":
+            if pos + 1 == count:
+                # a trailing special is dropped, which ends every level.
+                break
+            peek = tokens[pos + 1][0]
+            if peek not in PEEK_CHARS:
+                peek = "a"
+            new_state = PEEK_TRANSITIONS[peek, new_state, in_math_mode]
+            if new_state is None:
+                if in_math_mode and preserve_math_mode:
+                    # not escaping...
+                    fragment.append("\\")
+                new_state = state  # rewind
+            if new_state == BOLD or new_state == "STOP:bold" or new_state == "ESCAPE":
+                if len(tokens[pos + 1]) > 1:
+                    # only the first character is consumed.
+                    text = tokens[pos + 1]
+                    tokens[pos + 1 : pos + 2] = [text[0], text[1:]]
+                    count += 1
+                pos += 1
+                if new_state == "ESCAPE":
+                    fragment.append(tokens[pos])
+            elif new_state == "MATH-DELIM":
+                fragment.append(c)
+                in_math_mode = not in_math_mode
+
+        if new_state in NESTING_STATES:
+            # actual state transition
+            if fragment:
+                children.append("".join(fragment))
+                fragment = []
+            node = Node(new_state, [])
+            children.append(node)
+            stack.append((state, children))
+            state, children = new_state, node.children
+        elif new_state == "MATH-DELIM":
+            fragment.append(tokens[pos])
+            in_math_mode = not in_math_mode
+        elif new_state == "brace_match" or new_state == "STOP:brace_match":
+            fragment.append(tokens[pos])
+        elif new_state.startswith("STOP:"):
+            if not stack:
+                break
+            if fragment:
+                children.append("".join(fragment))
+                fragment = []
+            state, children = stack.pop()
+        pos += 1
+
+    # when the input runs out, every open level simply ends.
+    if fragment:
+        children.append("".join(fragment))
+    return root
+
+
+def _fix_inline_math(s):
+    """
+    Re-write $...$ as \\(...\\)
+    """
+    parts = s.split("$")
+    result = [parts[0]]
+    for i, part in enumerate(parts[1:]):
+        result.append("\\)" if i % 2 else "\\(")
+        result.append(part)
+    return "".join(result)
+
+
+def render(tree, target, inline_math_rewrite=False):
+    """
+    render(tree, target) -> string
+
+    Emit the parse tree for the target ("html" or "latex").
+    """
+    result = []
+    for item in tree:
+        if isinstance(item, six.string_types):
+            result.append(item)
+            continue
+        text = render(item.children, target, inline_math_rewrite)
+        if item.state == PROTECT_CASE:
+            result.append(text)
+        else:
+            assert target in EMITTERS, "don't know how to render %s for %r" % (
+                item.state,
+                target,
+            )
+            result.append(EMITTERS[target][item.state] % text)
+    result = "".join(result)
+    if target == "latex":
+        for c in LATEX_SPECIALS:
+            result = result.replace(c, "\\" + c)
+    if inline_math_rewrite and result.count("$") % 2 == 0:
+        result = _fix_inline_math(result)
+    return result
+
+
+def convert(value, target):
+    """
+    convert(value, target) -> string
+
+    Parse the markup in value and render it for the given target.
+    """
+    current = conf.snapshot()
+    tree = parse(value, current.preserve_math_mode)
+    return render(tree, target, current.inline_math_mode_rewrite)
+
+
+############################################################################
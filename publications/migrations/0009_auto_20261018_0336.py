@@ -0,0 +1,26 @@
+# Generated by Django 2.2.28 on 2026-10-18 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("publications", "0008_auto_20190205_1011")]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="rendered_bibtex",
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="publication",
+            name="rendered_html",
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="publication",
+            name="rendered_latex",
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.28 on 2026-10-18 08:45
+
+import django.db.models.deletion
+import publications.registry
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("publications", "0009_auto_20261018_0336")]
+
+    operations = [
+        migrations.AlterField(
+            model_name="publication",
+            name="Type",
+            field=publications.registry.EntryTypeForeignKey(
+                help_text="Begin by selecting the type of publication",
+                on_delete=django.db.models.deletion.PROTECT,
+                to="publications.Entry_Type",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:03
+
+from django.db import migrations, models
+from publications.utils import content_fingerprint
+
+
+def fill_fingerprints(apps, schema_editor):
+    Publication = apps.get_model("publications", "Publication")
+    fields = [
+        f.name
+        for f in Publication._meta.concrete_fields
+        if f.editable and isinstance(f, (models.CharField, models.TextField))
+    ]
+    for pub in Publication.objects.all().iterator():
+        pub.fingerprint = content_fingerprint(
+            pub.Type_id, dict((name, getattr(pub, name)) for name in fields)
+        )
+        pub.save(update_fields=["fingerprint"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("publications", "0011_importjob")]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="fingerprint",
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                fields=["Owner", "fingerprint"], name="publication_Owner_i_f56f85_idx"
+            ),
+        ),
+    ]
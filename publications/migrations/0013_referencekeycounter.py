@@ -0,0 +1,38 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("people", "0001_initial"),
+        ("publications", "0012_auto_20261018_0403"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReferenceKeyCounter",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.CharField(blank=True, max_length=32)),
+                ("last", models.PositiveIntegerField(default=0)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="people.Person"
+                    ),
+                ),
+            ],
+            options={"unique_together": {("owner", "year")},},
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from publications.similarity import band_keys, title_signature
+
+
+def fill_title_signatures(apps, schema_editor):
+    Publication = apps.get_model("publications", "Publication")
+    SimilarityBand = apps.get_model("publications", "SimilarityBand")
+    bands = []
+    for pub in Publication.objects.all().iterator():
+        pub.title_signature = title_signature(pub.title)
+        pub.save(update_fields=["title_signature"])
+        bands.extend(
+            SimilarityBand(publication_id=pub.pk, key=key)
+            for key in band_keys(pub.title_signature, pub.year)
+        )
+    SimilarityBand.objects.bulk_create(bands, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("publications", "0013_referencekeycounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="title_signature",
+            field=models.CharField(blank=True, editable=False, max_length=128),
+        ),
+        migrations.CreateModel(
+            name="SimilarityBand",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(db_index=True, max_length=16)),
+                (
+                    "publication",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="publications.Publication",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(fill_title_signatures, migrations.RunPython.noop),
+    ]
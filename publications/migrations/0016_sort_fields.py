@@ -0,0 +1,54 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:15
+
+from django.db import migrations, models
+from publications.utils import parse_month, parse_year
+
+
+def fill_sort_fields(apps, schema_editor):
+    Publication = apps.get_model("publications", "Publication")
+    batch = []
+    for pub in Publication.objects.only("year", "month").iterator():
+        pub.year_int = parse_year(pub.year)
+        pub.month_int = parse_month(pub.month)
+        batch.append(pub)
+        if len(batch) >= 500:
+            Publication.objects.bulk_update(batch, ["year_int", "month_int"])
+            batch = []
+    Publication.objects.bulk_update(batch, ["year_int", "month_int"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("publications", "0015_importcheckpoint")]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="month_int",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="publication",
+            name="year_int",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_sort_fields, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name="publication",
+            options={"ordering": ["-year_int", "-month_int", "author", "title"]},
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                fields=["-year_int", "-month_int"],
+                name="publication_year_in_97af9f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                fields=["Owner", "-year_int", "-month_int"],
+                name="publication_Owner_i_57c98d_idx",
+            ),
+        ),
+    ]
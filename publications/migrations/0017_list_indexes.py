@@ -0,0 +1,37 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("publications", "0016_sort_fields"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="publication", name="publication_Owner_i_57c98d_idx",
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                fields=["Owner", "Reference_Key"], name="pub_owner_refkey_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                condition=models.Q(("Active", True), ("public", True)),
+                fields=["-year_int", "-month_int", "author", "editor", "title"],
+                name="pub_recent_public_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                fields=["Owner", "key", "-year_int", "-month_int"],
+                name="pub_owner_key_idx",
+            ),
+        ),
+    ]
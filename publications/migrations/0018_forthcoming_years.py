@@ -0,0 +1,30 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:02
+
+from django.db import migrations
+from publications.utils import parse_year
+
+
+def fill_forthcoming_years(apps, schema_editor):
+    """
+    Years without a number (e.g., "in press") were stored as 0.
+    """
+    Publication = apps.get_model("publications", "Publication")
+    batch = []
+    for pub in Publication.objects.filter(year_int=0).only("year").iterator():
+        year_int = parse_year(pub.year)
+        if year_int:
+            pub.year_int = year_int
+            batch.append(pub)
+        if len(batch) >= 500:
+            Publication.objects.bulk_update(batch, ["year_int"])
+            batch = []
+    Publication.objects.bulk_update(batch, ["year_int"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("publications", "0017_list_indexes")]
+
+    operations = [
+        migrations.RunPython(fill_forthcoming_years, migrations.RunPython.noop)
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:45
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def rename_duplicate_keys(apps, schema_editor):
+    """
+    An owner's Reference_Keys were not unique in the database: keep the
+    oldest publication with a key, and give the others "<key>-2", etc.
+    """
+    Publication = apps.get_model("publications", "Publication")
+    duplicates = (
+        Publication.objects.values("Owner", "Reference_Key")
+        .annotate(count=Count("pk"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        pubs = Publication.objects.filter(
+            Owner=row["Owner"], Reference_Key=row["Reference_Key"]
+        ).order_by("pk")[1:]
+        n = 1
+        for pub in pubs:
+            while True:
+                n += 1
+                key = "{0}-{1}".format(row["Reference_Key"], n)
+                if not Publication.objects.filter(
+                    Owner=row["Owner"], Reference_Key=key
+                ).exists():
+                    break
+            # (the stored BibTeX has the old key; it is rendered when needed.)
+            Publication.objects.filter(pk=pub.pk).update(
+                Reference_Key=key, rendered_bibtex=None
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("people", "0001_initial"),
+        ("publications", "0018_forthcoming_years"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_keys, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="publication", unique_together={("Owner", "Reference_Key")}
+        ),
+        migrations.RemoveIndex(model_name="publication", name="pub_owner_refkey_idx"),
+    ]
@@ -2,21 +2,41 @@
 ###############
 from __future__ import print_function, unicode_literals
 
+import hashlib
+import io
+import json
 import sys
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from itertools import islice
 
 from django.conf import settings
-from django.db import models
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 from django.template import Context, Template
+from django.urls import reverse
 
 ###############
-from django.utils import six
+from django.utils import six, timezone
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
 from people.models import Person
 
-from . import conf
-from .utils import fix_reference_key, latex_unicode_fixes
+from . import conf, markup, similarity
+from .bibstream import iter_entries
+from .cache import PEOPLE, PUBLICATIONS, bump_version, get_version, template_cache
+from .registry import EntryTypeForeignKey, entry_type_registry, get_field_plan
+from .utils import (
+    content_fingerprint,
+    fix_reference_key,
+    index_to_sequence,
+    latex_unicode_fixes,
+    parse_month,
+    parse_year,
+    sequence_to_index,
+)
 
 # Publication Database
 # See http://en.wikipedia.org/wiki/BibTeX for the underlying idea.
@@ -25,7 +45,23 @@ from .utils import fix_reference_key, latex_unicode_fixes
 
 DOCUTILS_SETTINGS = getattr(settings, "RESTRUCTUREDTEXT_FILTER_SETTINGS", {})
 
-RECENT_COUNT = conf.get("recent_count")
+RENDERED_FIELDS = ["rendered_html", "rendered_latex", "rendered_bibtex"]
+
+# the Entry_Type fields which the renderings of its publications depend on
+RENDERING_FIELDS = [
+    "Required_Fields",
+    "Optional_Fields",
+    "html_Template",
+    "latex_Template",
+    "rtf_Template",
+]
+
+NO_TEMPLATE = {
+    "html": mark_safe(
+        '<tt class="error" style="color:red;">[!] NO TEMPLATE for publication entry type: "%s" [!]</tt>'
+    ),
+    "latex": '\\texttt{[!] NO TEMPLATE for publication entry type: "%s" [!]}',
+}
 
 ############################################################################
 
@@ -53,7 +89,7 @@ class Entry_Type(models.Model):
     #   3. I don't know squat about RTF
     #           Start at: http://en.wikipedia.org/wiki/Rich_Text_Format
 
-    # Find a way to Cache the compiled templates!
+    # Compiled templates are cached in publications.cache.template_cache
 
     def __str__(self):
         return self.Name
@@ -62,61 +98,45 @@ class Entry_Type(models.Model):
         ordering = ["Name"]
         verbose_name = "Entry Type"
 
+    @property
+    def field_plan(self):
+        """
+        The parsed Required_Fields/Optional_Fields, see
+        publications.registry.FieldPlan
+        """
+        return get_field_plan(self.Required_Fields, self.Optional_Fields)
+
     def get_only_required_list(self):
         """
         return a list of the required fields.  No slash processing.
         """
-        if not self.Required_Fields:
-            return []
-        return self.Required_Fields.split(",")
+        return list(self.field_plan.only_required)
 
     def get_required_field_list(self):
         """
         returns a list of any required fields (including slash fields)
         """
-        L = self.get_only_required_list()
-        M = []
-        for l in L:
-            M += l.split("/")
-        return list(set(M))
+        return list(self.field_plan.required)
 
     def is_required(self, field_name):
         """
         returns True only if field_name is required BY ITSELF (not a /)
         """
-        return field_name in self.get_only_required_list()
+        return field_name in self.field_plan.only_required
 
     def get_optional_field_list(self):
-        if not self.Optional_Fields:
-            return []
-        L = self.Optional_Fields.split(",")
-        M = []
-        for l in L:
-            M += l.split("/")
-        return list(set(M))
+        return list(self.field_plan.optional)
 
     def get_field_list(self):
-        return list(
-            set(self.get_required_field_list() + self.get_optional_field_list())
-        )
-
-    _Entry_Type__compiledTemplates = {}  # for caching.
+        return list(self.field_plan.fields)
 
     def get_template(self, target):
         """
         returns the compiled template for the given target.
         """
-        try:
-            return self.__compiledTemplates[target]
-        except KeyError:
-            if target not in ["html", "latex", "rtf"]:
-                return None
-            tmpl_src = getattr(self, "%s_Template" % target)
-            #   do not cache: uncomment next line:
-            return Template(tmpl_src)
-            # CACHE:
-            self.__compiledTemplates[target] = Template(tmpl_src)
-            return self.__compiledTemplates[target]
+        if target not in ["html", "latex", "rtf"]:
+            return None
+        return template_cache.get(self, target)
 
 
 ############################################################################
@@ -190,7 +210,7 @@ class PublicationQuerySet(models.query.QuerySet):
         """
         Limits the number returned, also applies the active() filter.
         """
-        return self.most_recent_order_with_key()[:RECENT_COUNT]
+        return self.most_recent_order_with_key()[: conf.snapshot().recent_count]
 
     def as_bibtex(self, flat=False, include_url=False):
         """
@@ -200,9 +220,47 @@ class PublicationQuerySet(models.query.QuerySet):
         If ``flat == True``, then this list is joined into a single text
         string.
         """
-        result = []
-        for e in self:
-            result.append(e.as_bibtex())
+        return self.render("bibtex", flat=flat, include_url=include_url)
+
+    def iter_rendered(self, target, include_url=False, stored=True):
+        """
+        Generate (publication, text) pairs for this query set, rendered for
+        the target ("html", "latex" or "bibtex"), in a single pass.
+
+        Stored renderings are used when present (and ``stored == True``);
+        otherwise the field list and compiled template of each Entry_Type
+        are looked up once for the whole pass.
+        """
+        if self._result_cache is not None:
+            publications = self._result_cache
+        else:
+            publications = self.iterator()
+        plans = {}
+        for pub in publications:
+            text = pub.get_stored(target, include_url) if stored else None
+            if text is None:
+                try:
+                    fields, template = plans[pub.Type_id]
+                except KeyError:
+                    entry_type = pub.Type
+                    fields = entry_type.field_plan.fields
+                    template = None
+                    if target in NO_TEMPLATE and entry_type.html_Template:
+                        template = entry_type.get_template(target)
+                    plans[pub.Type_id] = fields, template
+                text = pub.render(target, include_url, fields, template)
+            yield pub, text
+
+    def render(self, target, include_url=False, flat=False, stored=True):
+        """
+        Returns a list of text strings representing the current query set
+        rendered for the target ("html", "latex" or "bibtex");
+        see iter_rendered().
+
+        If ``flat == True``, then this list is joined into a single text
+        string.
+        """
+        result = [text for pub, text in self.iter_rendered(target, include_url, stored)]
         if flat:
             result = "\n\n".join(result)
         return result
@@ -228,26 +286,185 @@ class PublicationQuerySet(models.query.QuerySet):
         for e in self:
             e.save()
 
+    def rerender(self, batch_size=500):
+        """
+        Rebuild the stored renderings (``rendered_html``, etc.) of every
+        publication in this queryset.  Last_Updated is not changed, but
+        cached publication lists are invalidated.
+
+        Returns the number of publications updated.
+        """
+        pk_list = list(self.values_list("pk", flat=True))
+        count = 0
+        for i in range(0, len(pk_list), batch_size):
+            batch = list(
+                self.model.objects.filter(pk__in=pk_list[i : i + batch_size]).order_by()
+            )
+            for pub in batch:
+                pub.render_stored()
+            with transaction.atomic():
+                self.model.objects.bulk_update(batch, RENDERED_FIELDS)
+            count += len(batch)
+        if count:
+            # bulk_update() sends no signals.
+            bump_version(PUBLICATIONS)
+        return count
+
+    def clear_rendered(self):
+        """
+        Drop the stored renderings of the publications in this queryset:
+        they are rendered when shown, until rerender() (e.g., the
+        "publications rerender --stale" command) stores them again.
+
+        Returns the number of publications updated.
+        """
+        count = self.update(**dict((name, None) for name in RENDERED_FIELDS))
+        if count:
+            # update() sends no signals.
+            bump_version(PUBLICATIONS)
+        return count
+
     def most_recent_order(self):
         """
         Sort this query set into chronolgical order (most recent first).
         Note that the sort key is ignored here.
         """
-        return self.order_by("-year", "-month", "author", "editor", "title")
+        return self.order_by("-year_int", "-month_int", "author", "editor", "title")
 
     def most_recent_order_with_key(self):
         """
         Sort this query set into chronolgical order (most recent first).
         Note that the sort key is *not* ignored here.
         """
-        return self.order_by("key", "-year", "-month", "author", "editor", "title")
+        return self.order_by(
+            "key", "-year_int", "-month_int", "author", "editor", "title"
+        )
 
     def bibliography_order(self):
         """
         Sort this query set into alphabetical order (typical
         bibliographic ordering).
         """
-        return self.order_by("key", "author", "editor", "year", "month", "title")
+        return self.order_by(
+            "key", "author", "editor", "year_int", "month_int", "title"
+        )
+
+
+# BibTeX declarations which are not publications
+NON_ENTRY_TYPES = {"string", "preamble"}
+
+# BibTeX fields with a different name on Publication
+IMPORT_FIELD_ALIASES = {"ID": "Reference_Key", "url": "URL"}
+
+
+@lru_cache(maxsize=None)
+def get_content_fields():
+    """
+    get_content_fields() -> tuple of Publication field names
+
+    The BibTeX content of a publication: its editable text fields.
+    """
+    return tuple(
+        f.name
+        for f in Publication._meta.concrete_fields
+        if f.editable and isinstance(f, (models.CharField, models.TextField))
+    )
+
+
+@lru_cache(maxsize=256)
+def import_field_name(field):
+    """
+    import_field_name(field) -> Publication field name, or None
+
+    Map a bibtexparser entry field name to a Publication field: the text
+    fields of Publication match BibTeX names as is, lower or upper case.
+    """
+    if field in IMPORT_FIELD_ALIASES:
+        return IMPORT_FIELD_ALIASES[field]
+    names = get_content_fields()
+    for name in [field, field.lower(), field.upper()]:
+        if name in names:
+            return name
+    return None
+
+
+def iter_bibtex_values(fp):
+    """
+    iter_bibtex_values(fp) -> generator of (entry type name, values)
+
+    Parse the (text or binary) file object fp one entry at a time.
+    values is a dictionary of Publication field values, with LaTeX
+    translated to Unicode.  There is no database access here, so this can
+    run in another process.
+    """
+    import bibtexparser.bparser
+
+    # nonstandard entry types are reported, not silently dropped.
+    # @string definitions are kept by the parser for later entries.
+    parser = bibtexparser.bparser.BibTexParser(ignore_nonstandard_types=False)
+    parser.expect_multiple_parse = True
+    database = parser.bib_database
+    for name, text in iter_entries(fp):
+        parser.parse(text)
+        entries = database.entries[:]
+        del database.entries[:]
+        for entry in entries:
+            values = {}
+            for field, value in entry.items():
+                attrname = import_field_name(field)
+                if attrname is None:
+                    continue
+                if attrname == "Reference_Key":
+                    value = fix_reference_key(value)
+                elif attrname != "URL":
+                    # do not mangle urls
+                    value = latex_unicode_fixes(value)
+                values[attrname] = value
+            yield entry["ENTRYTYPE"], values
+
+
+@python_2_unicode_compatible
+class ImportSummary(object):
+    """
+    The outcome of PublicationManager.save_imported().
+
+    ``created`` and ``updated`` are lists of Reference_Keys;
+    ``skipped`` and ``failed`` are lists of (Reference_Key, reason) pairs.
+    ``duplicates`` is a list of (Reference_Key, publication) pairs: saved
+    entries which look like a publication of another owner (e.g., a
+    co-author's copy).
+    ``resumed`` is the number of entries committed by an earlier,
+    interrupted import of the same file (see ImportCheckpoint), and not
+    processed again.
+    """
+
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.skipped = []
+        self.failed = []
+        self.duplicates = []
+        self.resumed = 0
+
+    def __len__(self):
+        """
+        The number of entries processed (or resumed after).
+        """
+        return (
+            self.resumed
+            + len(self.created)
+            + len(self.updated)
+            + len(self.skipped)
+            + len(self.failed)
+        )
+
+    def __str__(self):
+        text = "{0} created, {1} updated, {2} skipped, {3} failed".format(
+            len(self.created), len(self.updated), len(self.skipped), len(self.failed)
+        )
+        if self.resumed:
+            text += " (resumed after {0} entries)".format(self.resumed)
+        return text
 
 
 class PublicationManager(models.Manager):
@@ -269,62 +486,187 @@ class PublicationManager(models.Manager):
 
         ** Note that the publication Owner is *not set* by this method. **
         """
-        import bibtexparser
-        from bibtexparser.latexenc import latex_to_unicode
-        from bibtexparser.customization import convert_to_unicode
-        from io import StringIO
-
-        def _field_map(field):
-            """
-            Map bibtexparser entry field name to Publication field
-            """
-            if field == "ID":
-                return "Reference_Key"
-            if field == "ENTRYTYPE":
-                return None
-            if field == "url":
-                return "URL"
-            if hasattr(Publication, field):
-                return field
-            f = field.lower()
-            if hasattr(Publication, f):
-                return f
-            f = field.upper()
-            if hasattr(Publication, f):
-                return f
-            return None
+        if not is_stream:
+            if isinstance(text, bytes):
+                text = text.decode("utf-8")
+            text = io.StringIO(text)
+        return list(self.iter_from_bibtex(text))
 
-        def _value_map(attrname, value):
-            # fix unicode em-dash and en-dash
-            if attrname == "Reference_Key":
-                return fix_reference_key(value)
-            if attrname == "URL":
-                # do not mangle urls
-                return value
-            for fixer in [latex_unicode_fixes]:
-                value = fixer(value)
-            return value
-
-        def _pub_from_entry(entry):
-            key = entry.get("ID", None)
-            entry_type = entry.get("ENTRYTYPE", None)
-            pub = Publication()
-            pub.Reference_Key = key
-            pub.Type = Entry_Type.objects.get(Name=entry_type)
-            for field in entry:
-                attrname = _field_map(field)
-                if attrname is None:
-                    continue
-                value = _value_map(attrname, entry[field])
-                setattr(pub, attrname, value)
-            return pub
+    def iter_from_bibtex(self, fp):
+        """
+        Like load_from_bibtex(), but generate the publications, reading
+        the (text or binary) file object fp one entry at a time.
+
+        If fp is seekable, it is read twice: every entry type is resolved
+        before any publication is built.  Otherwise an unknown entry type
+        raises Entry_Type.DoesNotExist when it is reached.
+        """
+        entry_types = {}
+        if fp.seekable():
+            entry_types = entry_type_registry.resolve(
+                set(name for name, text in iter_entries(fp)) - NON_ENTRY_TYPES
+            )
+            fp.seek(0)
+
+        for name, values in iter_bibtex_values(fp):
+            if name not in entry_types:
+                entry_types.update(entry_type_registry.resolve([name]))
+            yield Publication(Type=entry_types[name], **values)
+
+    def save_imported(
+        self,
+        pub_list,
+        owner,
+        overwrite=True,
+        batch_size=500,
+        atomic=True,
+        progress=None,
+        checkpoint=None,
+    ):
+        """
+        Save an iterable of (unsaved) publications, e.g., from
+        iter_from_bibtex(), for the given owner.  They are written
+        batch_size at a time, all in a single transaction if ``atomic``,
+        and otherwise in a transaction per batch.
+
+        Publications with the Reference_Key of an existing publication of
+        the owner replace it if ``overwrite``, and are skipped otherwise.
+        Publications with invalid field values are not saved.
 
-        if not is_stream and isinstance(text, bytes):
-            text = text.decode("utf-8")
+        progress, if given, is called with the ImportSummary so far after
+        each batch (in the transaction of the batch).
 
-        bibloader = bibtexparser.load if is_stream else bibtexparser.loads
-        data = bibloader(text)
-        return [_pub_from_entry(entry) for entry in data.entries]
+        checkpoint, if given, is an ImportCheckpoint for the file: the
+        entries it records as committed are skipped, and it is advanced
+        with each batch (in the transaction of the batch).  It is deleted
+        once every entry is saved.  Use it with ``atomic=False``, so an
+        interrupted import can be resumed.
+
+        Returns an ImportSummary.
+        """
+        if atomic:
+            with transaction.atomic():
+                return self.save_imported(
+                    pub_list, owner, overwrite, batch_size, False, progress, checkpoint
+                )
+
+        summary = ImportSummary()
+        update_fields = [
+            f.name for f in self.model._meta.concrete_fields if not f.primary_key
+        ]
+        creates, updates, unkeyed = [], [], []
+
+        def _flush():
+            # reserve keys for the batch, a block per year.
+            by_year = OrderedDict()
+            for pub in unkeyed:
+                by_year.setdefault(pub.year, []).append(pub)
+            for year, pubs in by_year.items():
+                keys = ReferenceKeyCounter.objects.reserve(owner, year, len(pubs))
+                for pub, key in zip(pubs, keys):
+                    pub.Reference_Key = key
+                    pub.fingerprint = pub.get_fingerprint()
+                    creates.append(pub)
+            del unkeyed[:]
+            for pub in creates + updates:
+                pub.set_sort_fields()
+                pub.title_signature = pub.get_title_signature()
+                pub.render_stored()
+            summary.duplicates.extend(
+                (pub.Reference_Key, other)
+                for pub, other in SimilarityBand.objects.near_duplicates(
+                    creates + updates, exclude_owner=owner
+                )
+            )
+            with transaction.atomic():
+                self.bulk_create(creates, batch_size=batch_size)
+                self.bulk_update(updates, update_fields, batch_size=batch_size)
+                if any(pub.pk is None for pub in creates):
+                    # (only some databases return the new primary keys.)
+                    pks = dict(
+                        self.filter(
+                            Owner=owner,
+                            Reference_Key__in=[pub.Reference_Key for pub in creates],
+                        ).values_list("Reference_Key", "pk")
+                    )
+                    for pub in creates:
+                        pub.pk = pks[pub.Reference_Key]
+                SimilarityBand.objects.update_for(creates + updates)
+                summary.created.extend(pub.Reference_Key for pub in creates)
+                summary.updated.extend(pub.Reference_Key for pub in updates)
+                if checkpoint is not None:
+                    checkpoint.advance(len(summary))
+                if progress is not None:
+                    progress(summary)
+            if creates or updates:
+                # bulk_create() and bulk_update() send no signals.
+                bump_version(PUBLICATIONS)
+            del creates[:], updates[:]
+
+        existing = dict(
+            (key, (pk, fingerprint))
+            for key, pk, fingerprint in self.filter(Owner=owner)
+            .values_list("Reference_Key", "pk", "fingerprint")
+            .order_by()
+        )
+
+        def _clean(pub):
+            # returns the reason pub is invalid, or None.
+            pub.Owner = owner
+            # (foreign keys are not checked: that costs a query each.)
+            exclude = ["Owner", "Type"]
+            if not pub.Reference_Key:
+                # one is reserved when the batch is written.
+                exclude.append("Reference_Key")
+            try:
+                pub.clean_fields(exclude=exclude)
+            except ValidationError as e:
+                return "; ".join(
+                    "{0}: {1}".format(field, " ".join(messages))
+                    for field, messages in sorted(e.message_dict.items())
+                )
+            return None
+
+        seen = set()
+        pub_list = iter(pub_list)
+        if checkpoint is not None and checkpoint.entries:
+            summary.resumed = checkpoint.entries
+            # the keys of the committed entries still count as seen.
+            for pub in islice(pub_list, checkpoint.entries):
+                if pub.Reference_Key and _clean(pub) is None:
+                    seen.add(pub.Reference_Key)
+        for pub in pub_list:
+            key = pub.Reference_Key
+            reason = _clean(pub)
+            if reason is not None:
+                summary.failed.append((key, reason))
+                continue
+
+            if not key:
+                unkeyed.append(pub)
+            elif key in seen:
+                summary.skipped.append((key, "duplicate key in this upload"))
+            elif key in existing:
+                pk, fingerprint = existing[key]
+                pub.fingerprint = pub.get_fingerprint()
+                if not overwrite:
+                    summary.skipped.append((key, "already exists"))
+                elif pub.fingerprint == fingerprint:
+                    summary.skipped.append((key, "unchanged"))
+                else:
+                    pub.pk = pk
+                    pub.Last_Updated = timezone.now()
+                    updates.append(pub)
+            else:
+                pub.fingerprint = pub.get_fingerprint()
+                creates.append(pub)
+            seen.add(key)
+            if len(creates) + len(updates) + len(unkeyed) >= batch_size:
+                _flush()
+        _flush()
+        if checkpoint is not None:
+            checkpoint.delete()
+        return summary
 
 
 PublicationManager = PublicationManager.from_queryset(PublicationQuerySet)
@@ -344,7 +686,7 @@ class Publication(models.Model):
         limit_choices_to={"active": True, "flags__slug": "publications"},
         help_text='Only people with the "publications" flag are shown',
     )
-    Type = models.ForeignKey(
+    Type = EntryTypeForeignKey(
         Entry_Type, on_delete=models.PROTECT, help_text=HELP_TEXT["Type"]
     )
     URL = models.URLField(
@@ -419,10 +761,26 @@ class Publication(models.Model):
         null=True, blank=True, max_length=32, help_text=HELP_TEXT["year"]
     )
 
-    objects = PublicationManager()
+    # Stored renderings, filled in by save() and rebuilt by
+    #   PublicationQuerySet.rerender() when an Entry_Type changes.
+    rendered_html = models.TextField(null=True, blank=True, editable=False)
+    rendered_latex = models.TextField(null=True, blank=True, editable=False)
+    rendered_bibtex = models.TextField(null=True, blank=True, editable=False)
 
-    class Meta:
-        unique_together = (("Owner", "Reference_Key"),)
+    # see get_fingerprint(); set by save(), and compared by importers to
+    #   skip unchanged entries.
+    fingerprint = models.CharField(max_length=40, blank=True, editable=False)
+
+    # see get_title_signature(); set by save(), and indexed by
+    #   SimilarityBand to find near duplicates.
+    title_signature = models.CharField(max_length=128, blank=True, editable=False)
+
+    # year and month as numbers, for sorting and filtering (0 when the
+    #   field has none); see set_sort_fields().
+    year_int = models.PositiveSmallIntegerField(default=0, editable=False)
+    month_int = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = PublicationManager()
 
     def sort_key(self):
         if self.key:
@@ -436,13 +794,18 @@ class Publication(models.Model):
     def __str__(self):
         return self.Reference_Key
 
-    def save(self):
+    def save(self, *args, **kwargs):
         """
         This bit of magic is to allow auto-incremening (ish) Reference Keys
         """
         if not self.Reference_Key:
-            refkey = self.guess_Reference_Key()
-        super(Publication, self).save()
+            self.guess_Reference_Key()
+        self.fingerprint = self.get_fingerprint()
+        self.title_signature = self.get_title_signature()
+        self.set_sort_fields()
+        self.render_stored()
+        super(Publication, self).save(*args, **kwargs)
+        SimilarityBand.objects.update_for([self])
         # should check for failure, in which case back off and retry...
         """
 from django.core.db import dbmod
@@ -453,36 +816,61 @@ except dbmod.Database.IntegrityError:
 pass        """
 
     class Meta:
-        ordering = ["-year", "author", "title"]
+        ordering = ["-year_int", "-month_int", "author", "title"]
+        # (its index serves the update and delete views, and save_imported.)
+        unique_together = (("Owner", "Reference_Key"),)
+        indexes = [
+            models.Index(fields=["Owner", "fingerprint"]),
+            models.Index(fields=["-year_int", "-month_int"]),
+            # active().public().most_recent_order() (the main page):
+            models.Index(
+                fields=["-year_int", "-month_int", "author", "editor", "title"],
+                name="pub_recent_public_idx",
+                condition=models.Q(Active=True, public=True),
+            ),
+            # most_recent_order_with_key() for an owner (personal pages):
+            models.Index(
+                fields=["Owner", "key", "-year_int", "-month_int"],
+                name="pub_owner_key_idx",
+            ),
+        ]
+
+    def set_sort_fields(self):
+        """
+        Set year_int and month_int from the year and month fields.
+        """
+        self.year_int = parse_year(self.year)
+        self.month_int = parse_month(self.month)
+
+    def get_fingerprint(self):
+        """
+        A hash of the entry type and content fields (see
+        publications.utils.content_fingerprint).
+        """
+        return content_fingerprint(
+            self.Type_id,
+            dict((name, getattr(self, name)) for name in get_content_fields()),
+        )
+
+    def get_title_signature(self):
+        """
+        The MinHash signature of the title (see publications.similarity).
+        """
+        return similarity.title_signature(self.title)
+
+    def get_band_keys(self):
+        return similarity.band_keys(self.title_signature, self.year)
 
     def guess_Reference_Key(self):
-        def __next_sequence(seq):
-            begin = seq[:-1]
-            last = seq[-1]
-            k = ord(last)
-            k += 1
-            if k > ord("z"):
-                return begin + "aa"
-            return begin + chr(k)
-
-        if self.Reference_Key:
-            return self.Reference_Key
-        # else: guess!
-        guess = self.Owner.slug + "-"
-        if self.year:
-            guess += str(self.year) + "-"
-        # check:
-        others = list(Publication.objects.filter(Reference_Key__istartswith=guess))
-        others.sort(key=lambda e: e.Reference_Key.lower())
-        if not others:
-            guess += "a"
-            self.Reference_Key = guess
-            return guess
-        last = others[-1]
-        sequence = last.Reference_Key.split("-")[-1]
-        guess += __next_sequence(sequence)
-        self.Reference_Key = guess
-        return guess
+        """
+        Set (and return) the next free Reference_Key for the owner and year
+        of this publication, e.g., "slug-2020-c"; see ReferenceKeyCounter.
+        """
+        if not self.Reference_Key:
+            self.Reference_Key = ReferenceKeyCounter.objects.reserve(
+                self.Owner, self.year
+            )[0]
+        return self.Reference_Key
 
     def check_field(self, field_name):
         if hasattr(self, field_name):
@@ -496,17 +884,13 @@ pass        """
         The list contains the required fields that were not present.
         if not list, then check passed.
         """
-        names = self.Type.Required_Fields.split(",")
+        plan = self.Type.field_plan
         # note that a name MAY contain a slash, which indicates that AT LEAST ONE of the
         #   field in that group is required.
         results = []
-        for name in names:
-            if "/" in name:
-                # check OR conditional
-                flag = bool(sum([self.check_field(sub) for sub in name.split("/")]))
-            else:
-                flag = self.check_field(name)
-            if not flag:
+        for name, group in zip(plan.only_required, plan.required_groups):
+            # check OR conditional
+            if not any(self.check_field(sub) for sub in group):
                 results.append(name)
         return results
 
@@ -520,217 +904,11 @@ pass        """
                 errors[field] = [msg]
         return errors
 
-    def __next_state(self, c, state, math_mode):
-
-        if state == "?ESCAPE?":
-            if c in ["*", "{", "}", "\\"]:
-                return "ESCAPE"
-            if c in ["(", ")", "[", "]"]:
-                return "MATH-DELIM"
-            return
-
-        if c == "\\":
-            return "?ESCAPE?"
-
-        if c == "$":
-            return "MATH-DELIM"
-
-        if c == "{" and state != "protect_case":
-            if math_mode:
-                return "brace_match"
-            return "protect_case"
-        if c == "}":
-            if math_mode:
-                return "STOP:brace_match"
-            if state == "protect_case":
-                return "STOP:protect_case"
-            else:
-                return "SKIP"
-
-        if state == "?italic?":
-            if c == "*":
-                return "bold"
-            else:
-                return "italic"
-
-        if state == "bold":
-            if c == "*":
-                return "?not-bold?"
-            # else no change
-
-        if state == "?not-bold?":
-            if c == "*":
-                return "STOP:bold"
-            else:
-                return "italic"
-
-        if state == "italic":
-            if c == "*":
-                return "STOP:italic"
-            # else no change
-
-        # default case:
-        if c == "*":
-            return "?italic?"
-        if c == "{":
-            return "protect_case"
-
-        # default: no change
-
-    def __build_parse_tree(
-        self, string, pos=0, current_state="normal", in_math_mode=False
-    ):
-        """
-        Returns a list of dictionaries, which map a state to a subobject.
-        A state can be:
-            'normal', 'italic', 'bold', 'protect_case'
-        A subobject can be:
-            another list of state maps, or a string.
-        Ultimately, all state maps have string values.
-
-        TODO: ~ or similar for non-breaking spaces
-        """
-        result = []
-        fragment = ""
-        preserve_math_mode = conf.get("preserve-math-mode")
-        # print('START build parse tree:', string,'; pos =', pos)
-        # print('    partial:', string[pos:])
-        # print('  math mode:', in_math_mode)
-        # print('      state:', current_state)
-
-        while pos < len(string):
-            c = string[pos]
-            new_state = self.__next_state(c, current_state, in_math_mode)
-            if new_state is not None:
-                if new_state.startswith("?"):
-                    if pos + 1 == len(string):
-                        break
-                    # print('next state look-ahead math_mode=', in_math_mode)
-                    # print('now:', new_state)
-                    new_state = self.__next_state(
-                        string[pos + 1], new_state, in_math_mode
-                    )  # peek
-                    # print('peek:', new_state)
-                    if new_state is None and in_math_mode and preserve_math_mode:
-                        # not escaping...
-                        # print('not escaping b/c math mode preservation')
-                        fragment += "\\"
-                    if new_state is None:
-                        new_state = current_state  # rewind
-                    if new_state in ["bold", "STOP:bold", "ESCAPE"]:
-                        pos += 1
-                    if new_state == "ESCAPE":
-                        # print('ESCAPE: math_mode=', in_math_mode)
-                        fragment += string[pos]
-                    if new_state == "MATH-DELIM":
-                        fragment += string[pos]
-                        in_math_mode = not in_math_mode
-                        # print('in_math_mode', in_math_mode)
-
-                if new_state in ["bold", "italic", "protect_case"]:
-                    # actual state transition
-                    if fragment:
-                        result.append(fragment)
-                        fragment = ""
-                    pos, subobj, in_math_mode = self.__build_parse_tree(
-                        string, pos + 1, new_state, in_math_mode
-                    )
-                    result.append([new_state, subobj])
-
-                if new_state == "MATH-DELIM":
-                    fragment += string[pos]
-                    in_math_mode = not in_math_mode
-                    # print('in_math_mode', in_math_mode)
-
-                if new_state == "SKIP":
-                    pass  # do nothing
-
-                if new_state == "brace_match":
-                    fragment += string[pos]
-                if new_state == "STOP:brace_match":
-                    fragment += string[pos]
-                    new_state = "normal"
-                if new_state.startswith("STOP:"):
-                    break
-            else:
-                fragment += c
-            pos += 1
-
-        if fragment:
-            result.append(fragment)
-        return pos, result, in_math_mode
-
-    def __render_tree(self, tree, target, text_transform=None):
-        """
-        """
-
-        def __escape_latex_specials(s):
-            for c in ["&", "#"]:
-                s = s.replace(c, "\\" + c)
-            return s
-
-        # end __escape_latex_specials
-
-        def __fix_inline_math(s):
-            # TODO: fix this to deal with '\\$'
-            vm = ""
-            state = False
-            for c in s:
-                if c == "$":
-                    if not state:
-                        vm += "\\("
-                    else:
-                        vm += "\\)"
-                    state = not state
-                else:
-                    vm += c
-            return vm
-
-        # end __fix_inline_math
-
-        # __render_tree() proper begins
-        if isinstance(tree, six.string_types):
-            if target == "latex":
-                return __escape_latex_specials(tree)
-            return tree
-        result = ""
-        for item in tree:
-            if isinstance(item, six.string_types):
-                result += item
-            else:
-                state, subobj = item
-                if state == "normal":
-                    result += self.__render_tree(subobj, target)
-                elif state == "italic":
-                    if target == "html":
-                        result += "<i>%s</i>" % self.__render_tree(subobj, target)
-                    elif target == "latex":
-                        result += "\\textit{%s}" % self.__render_tree(subobj, target)
-                    else:
-                        assert False  # don't know how to render italics for this target
-                elif state == "bold":
-                    if target == "html":
-                        result += "<b>%s</b>" % self.__render_tree(subobj, target)
-                    elif target == "latex":
-                        result += "\\textbf{%s}" % self.__render_tree(subobj, target)
-                    else:
-                        assert False  # don't know how to render bold for this target
-                elif state == "protect_case":
-                    if text_transform is None:
-                        result += self.__render_tree(subobj, target)
-                    else:
-                        assert False  # can't deal with text transforms yet.
-        if target == "latex":
-            result = __escape_latex_specials(result)
-        if conf.get("inline-math-mode-rewrite") and result.count("$") % 2 == 0:
-            result = __fix_inline_math(result)
-        return result
-
     def proc_for_target(self, field, value, target):
         """
         Using docutils is not sufficient here, as it wants to wrap every value
         as a paragraph.  Since the synxtax is quite simplified, its probably
-        best to roll my own:
+        best to roll my own (see publications.markup):
 
         \* \{ \}    - escaped literals
         *italics*
@@ -772,16 +950,16 @@ pass        """
             value = value.replace("--", "\u2013")  # en-dash
 
         # syntax processing here, i.e., '*', '**', '{}'
-        n, tree, mathmode = self.__build_parse_tree(value)
-        return mark_safe(self.__render_tree(tree, target))
+        return mark_safe(markup.convert(value, target))
 
-    def get_dictionary(self, target=None):
+    def get_dictionary(self, target=None, fields=None):
         """
         Get a dictionary of the BibTeX fields for this publication.
         Optionally restrict the fields.
         Additionally process values based on target.
         """
-        fields = self.Type.get_field_list()
+        if fields is None:
+            fields = self.Type.field_plan.fields
         result = {}
         for field in fields:
             if hasattr(self, field):
@@ -805,44 +983,98 @@ pass        """
         result["public"] = self.public
         return result
 
+    def render(self, target, include_url=False, fields=None, template=None):
+        """
+        Render this publication for the target: "html", "latex" or "bibtex".
+
+        ``fields`` (the Entry_Type field list) and ``template`` (a compiled
+        template) skip the per-publication lookups; see
+        PublicationQuerySet.render().
+        """
+        if target == "bibtex":
+            return self.as_bibtex(include_url=include_url, fields=fields)
+        if target not in NO_TEMPLATE:
+            raise ValueError("Unknown render target: %r" % target)
+        if template is None:
+            if not self.Type.html_Template:
+                return NO_TEMPLATE[target] % "{}".format(self.Type)
+            template = self.Type.get_template(target)
+        d = self.get_dictionary(target=target, fields=fields)
+        return template.render(Context(d))
+
     def as_html(self):
-        if not self.Type.html_Template:
-            return mark_safe(
-                '<tt class="error" style="color:red;">[!] NO TEMPLATE for publication entry type: "%s" [!]</tt>'
-                % "{}".format(self.Type)
-            )
-        t = self.Type.get_template("html")
-        d = self.get_dictionary(target="html")
-        return t.render(Context(d))
+        return self.render("html")
         # return 'HTML for ' + str(self)
 
     def as_LaTeX(self, template=None):
         """
         Note that this method allows for template overrides.
         """
-        if template is None:
-            if not self.Type.html_Template:
-                return (
-                    '\\texttt{[!] NO TEMPLATE for publication entry type: "%s" [!]}'
-                    % "{}".format(self.Type)
-                )
-            t = self.Type.get_template("latex")
-        else:
-            t = Template(template)
-        d = self.get_dictionary(target="latex")
-        return t.render(Context(d))
+        if template is not None:
+            template = Template(template)
+        return self.render("latex", template=template)
         # return 'LaTeX for ' + str(self)
 
+    def render_stored(self):
+        """
+        Fill in the stored renderings from the current field values.
+        (Does not save.)
+        """
+        self.rendered_html = self.as_html()
+        self.rendered_latex = self.as_LaTeX()
+        self.rendered_bibtex = self.as_bibtex()
+
+    def get_stored(self, target, include_url=False):
+        """
+        The stored rendering for the target, or None if there is none.
+        (The stored BibTeX never includes the URL.)
+        """
+        if target == "bibtex" and include_url:
+            return None
+        try:
+            value = getattr(self, "rendered_%s" % target)
+        except AttributeError:
+            return None
+        if value is not None and target == "html":
+            value = mark_safe(value)
+        return value
+
+    def stored_html(self):
+        """
+        The stored HTML rendering; rendered now if nothing has been stored.
+        """
+        if self.rendered_html is None:
+            return self.as_html()
+        return mark_safe(self.rendered_html)
+
+    def stored_LaTeX(self):
+        """
+        The stored LaTeX rendering; rendered now if nothing has been stored.
+        """
+        if self.rendered_latex is None:
+            return self.as_LaTeX()
+        return self.rendered_latex
+
+    def stored_bibtex(self):
+        """
+        The stored BibTeX text (without URL); rendered now if nothing
+        has been stored.
+        """
+        if self.rendered_bibtex is None:
+            return self.as_bibtex()
+        return self.rendered_bibtex
+
     def as_rtf(self):
         assert False  # not implemented
         return "RTF for " + str(self)
 
-    def as_bibtex(self, include_url=False):
+    def as_bibtex(self, include_url=False, fields=None):
         """
         Serialize this entry as a BibTeX text item.
         """
         data = {}
-        fields = self.Type.get_field_list()
+        if fields is None:
+            fields = self.Type.field_plan.fields
         for field in fields:
             if hasattr(self, field):
                 value = getattr(self, field)
@@ -862,5 +1094,430 @@ pass        """
         return "@" + typename + "{" + key + ",\n" + field_text + "\n}"
 
 
+############################################################################
+
+PublicationSummary = namedtuple("PublicationSummary", ["count", "last_updated"])
+
+NO_PUBLICATIONS = PublicationSummary(0, None)
+
+SUMMARY_CACHE_KEY = "publications:summaries:{0}:{1}"
+
+
+def get_people_with_publications():
+    """
+    get_people_with_publications() -> list of Person
+
+    Everyone with active publications or the "publications" flag,
+    annotated with ``publication_count`` and ``publications_updated`` (the
+    latest Last_Updated; None without active publications), and
+    ``publications_flag``.  One query, cached until a publication, person
+    or flag changes.
+    """
+    return _get_summaries()[0]
+
+
+def get_publication_summary(person):
+    """
+    get_publication_summary(person) -> PublicationSummary
+
+    The number of active publications of the person, and when they last
+    changed; see get_people_with_publications().
+    """
+    return _get_summaries()[1].get(person.pk, NO_PUBLICATIONS)
+
+
+def _get_summaries():
+    key = SUMMARY_CACHE_KEY.format(get_version(PUBLICATIONS), get_version(PEOPLE))
+    summaries = cache.get(key)
+    if summaries is None:
+        active = models.Q(publication__Active=True)
+        people = list(
+            Person.objects.annotate(
+                publication_count=models.Count("publication", filter=active),
+                publications_updated=models.Max(
+                    "publication__Last_Updated", filter=active
+                ),
+                publications_flag=models.Exists(
+                    Person.objects.filter(
+                        pk=models.OuterRef("pk"), flags__slug="publications"
+                    )
+                ),
+            ).filter(
+                models.Q(publication_count__gt=0) | models.Q(publications_flag=True)
+            )
+        )
+        summaries = (
+            people,
+            dict(
+                (
+                    person.pk,
+                    PublicationSummary(
+                        person.publication_count, person.publications_updated
+                    ),
+                )
+                for person in people
+            ),
+        )
+        cache.set(key, summaries, conf.get("list-cache-timeout"))
+    return summaries
+
+
+############################################################################
+
+
+class ReferenceKeyCounterManager(models.Manager):
+    def reserve(self, owner, year=None, count=1):
+        """
+        Allocate count new Reference_Keys for the owner and year, e.g.,
+        ["slug-2020-c", "slug-2020-d"].  Returns a list.
+
+        The counter row is locked (SELECT ... FOR UPDATE) while it is
+        advanced, so concurrent callers never get the same key.  Keys are
+        also given by hand and by imports, so the new keys always come
+        after the last one in use with the prefix.
+        """
+        year = str(year).strip() if year else ""
+        prefix = owner.slug + "-"
+        if year:
+            prefix += year + "-"
+        with transaction.atomic():
+            try:
+                counter = self.select_for_update().get(owner=owner, year=year)
+            except self.model.DoesNotExist:
+                counter, created = self.get_or_create(owner=owner, year=year)
+                if not created:
+                    counter = self.select_for_update().get(pk=counter.pk)
+            keys = Publication.objects.filter(
+                Owner=owner, Reference_Key__istartswith=prefix
+            ).values_list("Reference_Key", flat=True)
+            counter.last = max(
+                [sequence_to_index(key[len(prefix) :]) for key in keys] + [counter.last]
+            )
+            first = counter.last + 1
+            counter.last += count
+            counter.save(update_fields=["last"])
+        return [prefix + index_to_sequence(n) for n in range(first, first + count)]
+
+
+class ReferenceKeyCounter(models.Model):
+    """
+    The last Reference_Key suffix allocated for an owner and year
+    (see Publication.guess_Reference_Key).
+    """
+
+    owner = models.ForeignKey(Person, on_delete=models.CASCADE)
+    year = models.CharField(max_length=32, blank=True)
+    last = models.PositiveIntegerField(default=0)
+
+    objects = ReferenceKeyCounterManager()
+
+    class Meta:
+        unique_together = (("owner", "year"),)
+
+
+############################################################################
+
+
+class SimilarityBandManager(models.Manager):
+    def update_for(self, publications):
+        """
+        Replace the band keys of the (saved) publications.
+        """
+        self.filter(publication__in=[pub.pk for pub in publications]).delete()
+        self.bulk_create(
+            [
+                self.model(publication=pub, key=key)
+                for pub in publications
+                for key in pub.get_band_keys()
+            ]
+        )
+
+    def near_duplicates(self, publications, exclude_owner=None):
+        """
+        Returns a list of (publication, other) pairs: saved publications
+        which are near duplicates of one of the given publications (saved
+        or not).  One query, over the band keys of the publications.
+        """
+        keys = {}
+        for pub in publications:
+            if not pub.title_signature:
+                pub.title_signature = pub.get_title_signature()
+            for key in pub.get_band_keys():
+                keys.setdefault(key, []).append(pub)
+        if not keys:
+            return []
+        candidates = self.filter(key__in=list(keys)).select_related(
+            "publication", "publication__Owner"
+        )
+        if exclude_owner is not None:
+            candidates = candidates.exclude(publication__Owner=exclude_owner)
+        pairs = []
+        seen = set()
+        for band in candidates:
+            other = band.publication
+            for pub in keys[band.key]:
+                if (id(pub), other.pk) in seen or pub.pk == other.pk:
+                    continue
+                seen.add((id(pub), other.pk))
+                if similarity.is_near_duplicate(pub, other):
+                    pairs.append((pub, other))
+        return pairs
+
+
+class SimilarityBand(models.Model):
+    """
+    A band key of the title signature of a publication: publications
+    sharing a key are candidate near duplicates (see
+    publications.similarity).
+    """
+
+    publication = models.ForeignKey(Publication, on_delete=models.CASCADE)
+    key = models.CharField(max_length=16, db_index=True)
+
+    objects = SimilarityBandManager()
+
+
+############################################################################
+
+
+class ImportCheckpointManager(models.Manager):
+    def for_file(self, owner, fp, chunk_size=64 * 1024):
+        """
+        The checkpoint for importing the (binary) file object fp for the
+        owner, identified by a digest of its content; a new checkpoint
+        (at the first entry) if there is none.  fp is left at the start.
+        """
+        digest = hashlib.sha1()
+        for data in iter(lambda: fp.read(chunk_size), b""):
+            digest.update(data)
+        fp.seek(0)
+        checkpoint, created = self.get_or_create(owner=owner, digest=digest.hexdigest())
+        return checkpoint
+
+
+class ImportCheckpoint(models.Model):
+    """
+    How far an import of a file got: the number of entries (from the
+    start of the file) whose batches were committed.  See
+    PublicationManager.save_imported().
+    """
+
+    owner = models.ForeignKey(Person, on_delete=models.CASCADE)
+    digest = models.CharField(max_length=40)
+    entries = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = ImportCheckpointManager()
+
+    class Meta:
+        unique_together = (("owner", "digest"),)
+
+    def advance(self, entries):
+        self.entries = entries
+        self.save(update_fields=["entries", "updated"])
+
+
+############################################################################
+
+
+class ImportJobQuerySet(models.query.QuerySet):
+    def pending(self):
+        """
+        Jobs waiting for a worker, oldest first.
+        """
+        return self.filter(status=ImportJob.QUEUED).order_by("created", "pk")
+
+    def claim(self):
+        """
+        Mark the oldest pending job as running and return it, or
+        return None if there is nothing to do.
+
+        Safe with several workers where the database supports
+        SELECT ... FOR UPDATE SKIP LOCKED.
+        """
+        with transaction.atomic():
+            job = self.pending().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = ImportJob.RUNNING
+            job.started = timezone.now()
+            job.save(update_fields=["status", "started"])
+        return job
+
+    def requeue(self):
+        """
+        Queue running and failed jobs again, e.g., after a worker was
+        stopped.  They resume from their checkpoints.
+        Returns the number of jobs requeued.
+        """
+        return self.filter(status__in=[ImportJob.RUNNING, ImportJob.FAILED]).update(
+            status=ImportJob.QUEUED, message=""
+        )
+
+
+@python_2_unicode_compatible
+class ImportJob(models.Model):
+    """
+    A BibTeX upload, imported by the ``import_worker`` command
+    (outside of the request which uploaded it).
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    owner = models.ForeignKey(
+        Person, on_delete=models.CASCADE, help_text="The owner of the publications"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        help_text="The user who uploaded the file",
+    )
+    file = models.FileField(upload_to="publications/imports/%Y/%m/")
+    overwrite = models.BooleanField(default=True)
+
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=QUEUED, db_index=True
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    # progress; total is known once the worker has scanned the file.
+    total = models.PositiveIntegerField(null=True, blank=True)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    # JSON: a list of [Reference_Key, reason] for skipped and failed entries
+    errors = models.TextField(blank=True, default="[]", editable=False)
+    # why the whole job failed, if it did.
+    message = models.TextField(blank=True)
+
+    objects = ImportJobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created"]
+        verbose_name = "Import Job"
+
+    def __str__(self):
+        return "BibTeX import #{0} for {1} ({2})".format(
+            self.pk, self.owner, self.status
+        )
+
+    def get_absolute_url(self):
+        return reverse("publications-import-status", kwargs={"pk": self.pk})
+
+    @property
+    def processed(self):
+        return (
+            self.created_count
+            + self.updated_count
+            + self.skipped_count
+            + self.failed_count
+        )
+
+    def get_errors(self):
+        return json.loads(self.errors or "[]")
+
+    def as_dict(self):
+        """
+        The status of this job, for the JSON status endpoint.
+        """
+        return {
+            "id": self.pk,
+            "owner": self.owner.slug,
+            "status": self.status,
+            "created": self.created.isoformat(),
+            "started": self.started.isoformat() if self.started else None,
+            "finished": self.finished.isoformat() if self.finished else None,
+            "total": self.total,
+            "processed": self.processed,
+            "created_count": self.created_count,
+            "updated_count": self.updated_count,
+            "skipped_count": self.skipped_count,
+            "failed_count": self.failed_count,
+            "errors": [
+                {"key": key, "reason": reason} for key, reason in self.get_errors()
+            ],
+            "message": self.message,
+        }
+
+    def update_progress(self, summary):
+        """
+        Record an ImportSummary (see PublicationManager.save_imported).
+        A resumed import adds to the progress recorded before.
+        """
+        if not summary.resumed:
+            self._previous = (0, 0, 0, 0, [])
+        elif not hasattr(self, "_previous"):
+            self._previous = (
+                self.created_count,
+                self.updated_count,
+                self.skipped_count,
+                self.failed_count,
+                self.get_errors(),
+            )
+        created, updated, skipped, failed, errors = self._previous
+        self.created_count = created + len(summary.created)
+        self.updated_count = updated + len(summary.updated)
+        self.skipped_count = skipped + len(summary.skipped)
+        self.failed_count = failed + len(summary.failed)
+        self.errors = json.dumps(errors + summary.skipped + summary.failed)
+        self.save(
+            update_fields=[
+                "created_count",
+                "updated_count",
+                "skipped_count",
+                "failed_count",
+                "errors",
+            ]
+        )
+
+    def run(self, batch_size=500):
+        """
+        Import the file.  Each batch of publications is committed as it
+        is written, so progress is visible while the job runs, and a job
+        which is run again resumes after the last committed batch.
+        """
+        try:
+            with self.file.open("rb") as fp:
+                self.total = sum(
+                    1 for name, text in iter_entries(fp) if name not in NON_ENTRY_TYPES
+                )
+                self.save(update_fields=["total"])
+                fp.seek(0)
+                checkpoint = ImportCheckpoint.objects.for_file(self.owner, fp)
+                summary = Publication.objects.save_imported(
+                    Publication.objects.iter_from_bibtex(fp),
+                    self.owner,
+                    overwrite=self.overwrite,
+                    batch_size=batch_size,
+                    atomic=False,
+                    progress=self.update_progress,
+                    checkpoint=checkpoint,
+                )
+        except Exception as e:
+            self.status = self.FAILED
+            self.message = str(e)
+        else:
+            self.update_progress(summary)
+            self.status = self.DONE
+            if not summary:
+                self.message = "No entries found.  Is this a BibTeX file?"
+        self.finished = timezone.now()
+        self.save(update_fields=["status", "message", "finished"])
+
+
 ############################################################################
 #
@@ -0,0 +1,196 @@
+"""
+Keyset (cursor) pagination for publication lists.
+
+A page is found by its position in the sort order, rather than by an
+OFFSET: the next page is the publications sorting after the last one
+on this page, so every page costs the same to find.  Cursors are the
+sort values (and primary key) of a publication, encoded for a URL.
+
+The page queries order by the sort fields themselves, so they can use
+an index on them.  NULLs sort differently from database to database (as
+the largest value, or the smallest), and are compared accordingly.
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+###############
+
+############################################################################
+
+
+def encode_cursor(values):
+    """
+    encode_cursor(values) -> string
+    """
+    data = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    decode_cursor(cursor) -> list of values
+
+    Raises ValueError for anything which is not a cursor.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data.decode("utf-8"))
+    except (TypeError, UnicodeError, ValueError) as e:
+        raise ValueError("Invalid cursor: {0}".format(e))
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def get_sort_fields(qs):
+    """
+    get_sort_fields(qs) -> list of (field name, descending)
+
+    The ordering of the query set, with the primary key last (to break
+    ties).
+    """
+    ordering = list(qs.query.order_by or qs.model._meta.ordering)
+    if "pk" not in ordering and "-pk" not in ordering:
+        ordering.append("pk")
+    return [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+
+
+def _get_field(model, name):
+    if name == "pk":
+        return model._meta.pk
+    return model._meta.get_field(name)
+
+
+def clean_cursor(qs, values):
+    """
+    clean_cursor(qs, values) -> list of values
+
+    The (decoded) cursor values as the sort fields of qs would hold them.
+    Raises ValueError for a cursor of the wrong length, or with a value
+    its field cannot hold.
+    """
+    sort = get_sort_fields(qs)
+    if len(values) != len(sort):
+        raise ValueError("Invalid cursor")
+    cleaned = []
+    for (name, descending), value in zip(sort, values):
+        if value is None:
+            cleaned.append(None)
+            continue
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            raise ValueError("Invalid cursor value for {0}".format(name))
+        try:
+            cleaned.append(_get_field(qs.model, name).to_python(value))
+        except (TypeError, ValidationError):
+            raise ValueError("Invalid cursor value for {0}".format(name))
+    return cleaned
+
+
+def cursor_exists(qs, values):
+    """
+    Is there an item of qs at the (cleaned) cursor?
+    """
+    condition = Q()
+    for (name, descending), value in zip(get_sort_fields(qs), values):
+        condition &= _equal(name, value)
+    return qs.filter(condition).exists()
+
+
+def _beyond(name, lookup, value, nulls_largest):
+    """
+    Q for the values of field name sorting after (lookup "gt") or before
+    ("lt") value.
+    """
+    toward_nulls = (lookup == "gt") == nulls_largest
+    if value is None:
+        if toward_nulls:
+            return Q(pk__in=[])  # nothing sorts beyond NULL
+        return Q(**{name + "__isnull": False})
+    condition = Q(**{"{0}__{1}".format(name, lookup): value})
+    if toward_nulls:
+        condition |= Q(**{name + "__isnull": True})
+    return condition
+
+
+def _equal(name, value):
+    if value is None:
+        return Q(**{name + "__isnull": True})
+    return Q(**{name: value})
+
+
+class KeysetPage(object):
+    """
+    A page of a query set; see keyset_page().
+    ``object_list`` is a query set of the publications on the page.
+    """
+
+    def __init__(self, object_list, previous_cursor=None, next_cursor=None):
+        self.object_list = object_list
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def keyset_page(qs, size, after=None, before=None):
+    """
+    keyset_page(qs, size, after=None, before=None) -> KeysetPage
+
+    The page of (at most) size items of the ordered query set qs: the
+    first page, or the page after or before a cursor (as decoded by
+    decode_cursor).  Raises ValueError for an invalid cursor (see
+    clean_cursor).  Two queries: one for the sort values of the page,
+    and (when it is used) one for the page itself.
+    """
+    sort = get_sort_fields(qs)
+    qs = qs.order_by(*[("-" if descending else "") + name for name, descending in sort])
+    names = [name for name, descending in sort]
+    nulls_largest = connections[qs.db].features.nulls_order_largest
+
+    cursor = after if before is None else before
+    rows = qs
+    if cursor is not None:
+        cursor = clean_cursor(qs, cursor)
+        condition = Q()
+        for i, (name, descending) in enumerate(sort):
+            # "after" a descending field is less than; "before" flips it.
+            lookup = "lt" if descending == (before is None) else "gt"
+            term = _beyond(name, lookup, cursor[i], nulls_largest)
+            for j in range(i):
+                term &= _equal(names[j], cursor[j])
+            condition |= term
+        rows = rows.filter(condition)
+    if before is not None:
+        rows = rows.reverse()
+    rows = list(rows.values_list(*names)[: size + 1])
+
+    more = len(rows) > size
+    rows = rows[:size]
+    if before is not None:
+        rows.reverse()
+        has_previous, has_next = more, True
+    else:
+        has_previous, has_next = after is not None, more
+    if not rows:
+        return KeysetPage(qs.none())
+    return KeysetPage(
+        qs.filter(pk__in=[row[-1] for row in rows]),
+        encode_cursor(rows[0]) if has_previous else None,
+        encode_cursor(rows[-1]) if has_next else None,
+    )
+
+
+############################################################################
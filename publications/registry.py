@@ -0,0 +1,189 @@
+"""
+An in-memory registry of Entry_Types, with precomputed field plans.
+
+There are only a handful of entry types and they rarely change, so every
+process loads them all once.  The registry is dropped when an Entry_Type
+is saved or deleted here, and reloaded when the shared entry type version
+(see publications.cache) moves in another process; that version is
+checked at most once per request.
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+from django.db import models
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+
+from .cache import ENTRY_TYPES, bump_version, get_version
+
+############################################################################
+
+# required_groups: tuple of OR-groups, e.g., (("author", "editor"), ("title",))
+# only_required: the names in Required_Fields, slashes and all.
+# required, optional, fields: field names, in declaration order.
+FieldPlan = namedtuple(
+    "FieldPlan", ["required_groups", "only_required", "required", "optional", "fields"]
+)
+
+
+def _unique(names):
+    """
+    Remove duplicates, keeping the order.
+    """
+    return tuple(OrderedDict.fromkeys(names))
+
+
+@lru_cache(maxsize=128)
+def get_field_plan(required_fields, optional_fields):
+    """
+    get_field_plan(required_fields, optional_fields) -> FieldPlan
+
+    Parse the comma/slash field strings of an Entry_Type.
+    """
+    only_required = tuple(required_fields.split(",")) if required_fields else ()
+    required_groups = tuple(tuple(name.split("/")) for name in only_required)
+    required = _unique(f for group in required_groups for f in group)
+    if optional_fields:
+        optional = _unique(
+            f for name in optional_fields.split(",") for f in name.split("/")
+        )
+    else:
+        optional = ()
+    return FieldPlan(
+        required_groups,
+        only_required,
+        required,
+        optional,
+        _unique(required + optional),
+    )
+
+
+############################################################################
+
+
+class EntryTypeRegistry(object):
+    """
+    All Entry_Types, by name.
+    """
+
+    namespace = ENTRY_TYPES
+
+    def __init__(self):
+        self._types = None
+        self._version = None
+        self._checked = False
+
+    def _load(self):
+        from .models import Entry_Type
+
+        self._version = get_version(self.namespace)
+        self._types = OrderedDict(
+            (entry_type.Name, entry_type) for entry_type in Entry_Type.objects.all()
+        )
+        self._checked = True
+
+    def _get_types(self):
+        if not self._checked:
+            self.sync()
+        if self._types is None:
+            self._load()
+        return self._types
+
+    def sync(self):
+        """
+        Drop the loaded types if the shared version has moved.
+        """
+        if get_version(self.namespace) != self._version:
+            self._types = None
+        self._checked = True
+
+    def expire(self):
+        """
+        Check the shared version again on the next lookup.
+        (Connected to request_started.)
+        """
+        self._checked = False
+
+    def invalidate(self):
+        """
+        Reload the types, here and in every other process.
+        """
+        self._types = None
+        bump_version(self.namespace)
+
+    def get(self, name):
+        """
+        Return the Entry_Type with the given name.
+
+        Raises Entry_Type.DoesNotExist for unknown names.
+        """
+        try:
+            return self._get_types()[name]
+        except KeyError:
+            pass
+        from .models import Entry_Type
+
+        # perhaps created in another process, not yet noticed.
+        entry_type = Entry_Type.objects.get(Name=name)
+        self._types = None
+        return entry_type
+
+    def resolve(self, names):
+        """
+        Return a dictionary of the Entry_Types with the given names.
+
+        Raises Entry_Type.DoesNotExist naming every unknown name.
+        """
+        from .models import Entry_Type
+
+        entry_types = {}
+        unknown = []
+        for name in sorted(names):
+            try:
+                entry_types[name] = self.get(name)
+            except Entry_Type.DoesNotExist:
+                unknown.append(name)
+        if unknown:
+            raise Entry_Type.DoesNotExist(
+                "Unknown entry type(s): {0}".format(", ".join(unknown))
+            )
+        return entry_types
+
+    def all(self):
+        """
+        Return a list of all Entry_Types, ordered by name.
+        """
+        return list(self._get_types().values())
+
+    def active(self):
+        """
+        Return a list of the active Entry_Types, ordered by name.
+        """
+        return [entry_type for entry_type in self.all() if entry_type.Active]
+
+
+entry_type_registry = EntryTypeRegistry()
+
+############################################################################
+
+
+class EntryTypeDescriptor(ForwardManyToOneDescriptor):
+    """
+    Resolve ``publication.Type`` from the registry instead of the database.
+    """
+
+    def get_object(self, instance):
+        return entry_type_registry.get(getattr(instance, self.field.attname))
+
+
+class EntryTypeForeignKey(models.ForeignKey):
+    """
+    A ForeignKey to Entry_Type which resolves through the registry.
+    """
+
+    forward_related_accessor_class = EntryTypeDescriptor
+
+
+############################################################################
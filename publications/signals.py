@@ -0,0 +1,90 @@
+"""
+Signal handlers for the publications app.
+
+These are connected in PublicationsConfig.ready()
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+from . import conf
+from .cache import PEOPLE, PUBLICATIONS, bump_version, template_cache
+from .registry import entry_type_registry
+
+############################################################################
+
+
+def entry_type_saving(sender, instance, raw=False, **kwargs):
+    """
+    pre_save for Entry_Type: note whether the templates or field lists
+    change (see entry_type_saved).
+    """
+    from .models import RENDERING_FIELDS
+
+    instance._rendering_changed = False
+    if raw:
+        return
+    previous = sender.objects.filter(pk=instance.pk).values(*RENDERING_FIELDS).first()
+    if previous is not None:
+        instance._rendering_changed = any(
+            previous[name] != getattr(instance, name) for name in RENDERING_FIELDS
+        )
+
+
+def entry_type_saved(sender, instance, raw=False, **kwargs):
+    """
+    post_save for Entry_Type: drop the compiled templates and, when the
+    templates or field lists changed, rebuild the stored renderings of
+    publications of this type.  Beyond the rerender-limit setting, the
+    renderings are only dropped (see PublicationQuerySet.clear_rendered).
+    """
+    template_cache.invalidate(instance)
+    entry_type_registry.invalidate()
+    if raw or not getattr(instance, "_rendering_changed", False):
+        return
+    publications = instance.publication_set.all()
+    if publications.count() > conf.get("rerender-limit"):
+        publications.clear_rendered()
+    else:
+        publications.rerender()
+
+
+def entry_type_deleted(sender, instance, **kwargs):
+    """
+    post_delete for Entry_Type: drop the compiled templates.
+    """
+    template_cache.invalidate(instance)
+    entry_type_registry.invalidate()
+
+
+def publication_changed(sender, instance, **kwargs):
+    """
+    post_save and post_delete for Publication: invalidate the cached
+    publication lists.
+    """
+    bump_version(PUBLICATIONS)
+
+
+def people_changed(sender, **kwargs):
+    """
+    post_save, post_delete and m2m_changed for people and their flags:
+    invalidate the cached publication access of users.
+    """
+    bump_version(PEOPLE)
+
+
+def setting_changed(sender, setting, **kwargs):
+    """
+    Rebuild the configuration snapshot when PUBLICATIONS_CONFIG changes.
+    """
+    if setting == conf.CONFIG_NAME:
+        conf.reset()
+
+
+def request_started(sender, **kwargs):
+    """
+    Check for entry type changes in other processes once per request.
+    """
+    entry_type_registry.expire()
+
+
+############################################################################
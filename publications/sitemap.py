@@ -1,14 +1,14 @@
 """
 Sitemap for publications application
 """
-import datetime
-
 from django.contrib.sitemaps import Sitemap
-from django.db.models import Max
+from django.db.models import Max, Q
 from django.urls import reverse
 from django.utils.timezone import now
 from people.models import Person
 
+from . import conf
+
 
 class Publication_Sitemap(Sitemap):
     """
@@ -18,12 +18,29 @@ class Publication_Sitemap(Sitemap):
     #    priority = 0.5
     #    changefreq = 'monthly'
 
+    @property
+    def limit(self):
+        """
+        People per sitemap page; longer sitemaps are split into pages
+        (listed by the sitemap index).
+        """
+        return conf.get("sitemap-page-size")
+
     def items(self):
         """
-        Return the items for this map
+        Return the items for this map, each annotated with the latest
+        Last_Updated of its active publications (one query per page).
         """
-        return Person.objects.filter(
-            active=True, slug__isnull=False, flags__slug="publications"
+        return (
+            Person.objects.filter(
+                active=True, slug__isnull=False, flags__slug="publications"
+            )
+            .annotate(
+                publications_updated=Max(
+                    "publication__Last_Updated", filter=Q(publication__Active=True)
+                )
+            )
+            .order_by("slug")
         )
 
     def location(self, item):
@@ -33,8 +50,4 @@ class Publication_Sitemap(Sitemap):
         """
         Last Modification datetime.
         """
-        publication_list = item.publication_set.active()
-        if publication_list:
-            return publication_list.aggregate(dt=Max("Last_Updated"))["dt"]
-        else:
-            return now()
+        return item.publications_updated or now()
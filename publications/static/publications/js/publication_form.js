@@ -0,0 +1,70 @@
+/*
+ * Shows the fields (and help text) of the publication form for the
+ * selected entry type.  The rules for each type are publicationFormSchema,
+ * from the form's schema_url().
+ */
+
+function set_row_display(name, show)
+{
+    var elem_input = document.getElementById('id_' + name);
+    var elem = elem_input.parentNode.parentNode;
+    if (elem)
+    {
+        if (show)
+        {
+            elem.style.display = '';
+        }
+        else
+        {
+            elem.style.display = 'none';
+        }
+    }
+}
+
+function set_help_text(name, text)
+{
+    var obj = document.getElementById('help-text-' + name);
+    if (obj) {
+        obj.innerHTML = text;
+    }
+}
+
+function hideAll()
+{
+    var hide = publicationFormSchema.hide;
+    for (var i = 0; i < hide.length; i++) {
+        set_row_display(hide[i], false);
+    }
+}
+
+function onTypeChange()
+{
+    set_help_text('Entry_Type', publicationFormSchema.help);
+    hideAll();
+    var type_selector = document.getElementById('id_Entry_Type');
+    var type_id = -1;
+    for (var i = 0; i < type_selector.options.length; i++) {
+        if (type_selector.options[i].selected == true) {
+            type_id = type_selector.options[i].value;
+            break
+        }
+    }
+    if (!publicationFormSchema.types.hasOwnProperty(type_id)) {
+        return;
+    }
+    var type = publicationFormSchema.types[type_id];
+    set_help_text('Entry_Type', type.description);
+    for (var i = 0; i < type.fields.length; i++) {
+        set_row_display(type.fields[i][0], true);
+        set_help_text(type.fields[i][0], type.fields[i][1]);
+    }
+    for (var i = 0; i < type.show.length; i++) {
+        set_row_display(type.show[i], true);
+    }
+}
+
+function publicationsOnLoad()
+{
+    hideAll();
+    onTypeChange();
+}
@@ -0,0 +1,30 @@
+"""
+Template tags for publications.
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+from django import template
+
+###############
+from ..models import get_publication_summary
+
+############################################################################
+
+register = template.Library()
+
+############################################################################
+
+
+@register.simple_tag
+def publication_summary(person):
+    """
+    {% publication_summary person as summary %}
+
+    The number of active publications of the person (summary.count), and
+    when they last changed (summary.last_updated).
+    """
+    return get_publication_summary(person)
+
+
+############################################################################
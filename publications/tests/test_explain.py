@@ -0,0 +1,86 @@
+"""
+The list queries use the indexes meant for them (see the
+"publications explain" command) on a large synthetic table.
+
+The checks run against the test database: SQLite, or PostgreSQL when the
+suite is run with a PostgreSQL database (and are skipped otherwise).
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+import datetime
+import random
+from importlib import import_module
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from people.models import Person
+
+###############
+from ..models import Publication
+
+# ("import" is a keyword: the cli modules are imported by name.)
+explain = import_module("publications.cli.explain")
+
+############################################################################
+
+ROWS = 100000
+OWNERS = 200
+
+
+class ExplainTests(TestCase):
+    fixtures = ["initial_entry_types"]
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        owners = [
+            Person.objects.create(username="p{0}".format(i), slug="p{0}".format(i))
+            for i in range(OWNERS)
+        ]
+        this_year = datetime.date.today().year
+        batch = []
+        for i in range(ROWS):
+            year = this_year - i % 47
+            batch.append(
+                Publication(
+                    Owner=owners[i % OWNERS],
+                    Type_id="article",
+                    Reference_Key="k{0}".format(i),
+                    author="A{0}, B.".format(i % 977),
+                    title="Title {0}".format(i),
+                    year=str(year),
+                    year_int=year,
+                    month_int=1 + i % 12,
+                    key="k{0}".format(i % 50) if i % 3 == 0 else None,
+                    Active=rng.random() > 0.05,
+                    public=rng.random() > 0.1,
+                )
+            )
+            if len(batch) == 500:
+                Publication.objects.bulk_create(batch)
+                batch = []
+        Publication.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.owner = owners[0]
+
+    def check_indexes(self):
+        results = explain.check_plans(self.owner)
+        self.assertEqual(len(results), 3)
+        for label, index, used, plan in results:
+            self.assertTrue(
+                used, "{0} does not use {1}:\n{2}".format(label, index, plan)
+            )
+
+    @skipUnless(connection.vendor == "sqlite", "not using SQLite")
+    def test_sqlite(self):
+        self.check_indexes()
+
+    @skipUnless(connection.vendor == "postgresql", "PostgreSQL is not available")
+    def test_postgresql(self):
+        self.check_indexes()
+
+
+############################################################################
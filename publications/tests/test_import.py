@@ -0,0 +1,140 @@
+"""
+Tests for resuming interrupted imports (PublicationManager.save_imported
+with an ImportCheckpoint), and for BibTeX uploads.
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from people.models import Person
+
+###############
+from ..forms import BibtexUploadForm
+from ..models import ImportCheckpoint, Publication
+
+############################################################################
+
+BIBTEX = """
+@article{a1, author={Smith, J.}, title={First}, journal={J}, year={2020}}
+@article{a2, author={Smith, J.}, title={Second}, journal={J}, year={2020}}
+@article{a3, author={Smith, J.}, title={Third}, journal={J}, year={2020}}
+@article{a4, author={Smith, J.}, title={Fourth}, journal={J}, year={2021}}
+@article{a1, author={Smith, J.}, title={First, again}, journal={J}, year={2021}}
+@article{a5, author={Smith, J.}, title={Fifth}, journal={J}, year={2021}}
+@article{a6, author={Smith, J.}, title={Sixth}, journal={J}, year={2022}}
+""".encode(
+    "utf-8"
+)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(items, count):
+    for i, item in enumerate(items):
+        if i == count:
+            raise Interrupted()
+        yield item
+
+
+class ResumeImportTests(TestCase):
+    fixtures = ["initial_entry_types"]
+
+    def setUp(self):
+        self.owner = Person.objects.create(username="owner", slug="owner")
+
+    def import_file(self, pubs=None, resume=True):
+        fp = io.BytesIO(BIBTEX)
+        checkpoint = ImportCheckpoint.objects.for_file(self.owner, fp)
+        if not resume:
+            checkpoint.advance(0)
+        if pubs is None:
+            pubs = Publication.objects.iter_from_bibtex(fp)
+        return Publication.objects.save_imported(
+            pubs, self.owner, batch_size=3, atomic=False, checkpoint=checkpoint
+        )
+
+    def saved_titles(self):
+        return dict(
+            Publication.objects.filter(Owner=self.owner).values_list(
+                "Reference_Key", "title"
+            )
+        )
+
+    def test_resume(self):
+        fp = io.BytesIO(BIBTEX)
+        pubs = interrupt_after(Publication.objects.iter_from_bibtex(fp), 4)
+        with self.assertRaises(Interrupted):
+            self.import_file(pubs)
+        # the first batch is committed, and the checkpoint says so.
+        self.assertEqual(sorted(self.saved_titles()), ["a1", "a2", "a3"])
+        self.assertEqual(ImportCheckpoint.objects.get(owner=self.owner).entries, 3)
+
+        summary = self.import_file()
+        self.assertEqual(summary.resumed, 3)
+        self.assertEqual(summary.created, ["a4", "a5", "a6"])
+        self.assertEqual(summary.updated, [])
+        self.assertEqual(summary.skipped, [("a1", "duplicate key in this upload")])
+        self.assertEqual(summary.failed, [])
+        self.assertEqual(len(summary), 7)
+        self.assertEqual(
+            self.saved_titles(),
+            {
+                "a1": "First",
+                "a2": "Second",
+                "a3": "Third",
+                "a4": "Fourth",
+                "a5": "Fifth",
+                "a6": "Sixth",
+            },
+        )
+        self.assertFalse(ImportCheckpoint.objects.filter(owner=self.owner).exists())
+
+    def test_import_again(self):
+        first = self.import_file()
+        self.assertEqual(first.created, ["a1", "a2", "a3", "a4", "a5", "a6"])
+        titles = self.saved_titles()
+
+        summary = self.import_file(resume=False)
+        self.assertEqual(summary.resumed, 0)
+        self.assertEqual((summary.created, summary.updated), ([], []))
+        self.assertEqual(
+            sorted(summary.skipped),
+            [("a1", "duplicate key in this upload")]
+            + [("a{0}".format(i), "unchanged") for i in range(1, 7)],
+        )
+        self.assertEqual(self.saved_titles(), titles)
+
+
+class UploadTests(TestCase):
+    fixtures = ["initial_entry_types"]
+
+    def setUp(self):
+        self.owner = Person.objects.create(username="owner", slug="owner")
+
+    def upload(self, text):
+        form = BibtexUploadForm(
+            {}, {"file": SimpleUploadedFile("upload.bib", text)}, owner=self.owner
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        return form, form.save_bibtex(self.owner)
+
+    def test_upload(self):
+        form, saved = self.upload(BIBTEX)
+        self.assertTrue(saved)
+        self.assertEqual(len(form.summary.created), 6)
+        self.assertEqual(Publication.objects.filter(Owner=self.owner).count(), 6)
+
+    def test_failed_entry_rolls_back(self):
+        bad = b"@misc{bad, title={Bad}, URL={not a url}}\n"
+        form, saved = self.upload(BIBTEX + bad)
+        self.assertFalse(saved)
+        self.assertIn("bad (URL:", str(form.non_field_errors()))
+        self.assertFalse(Publication.objects.filter(Owner=self.owner).exists())
+
+
+############################################################################
@@ -0,0 +1,253 @@
+"""
+Golden output for publications.markup: the expected HTML and LaTeX were
+produced by the per-character renderer it replaced, and the fixture
+templates (initial_entry_types.json) rendered with it.
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+import json
+import os
+
+from django.test import SimpleTestCase, override_settings
+from django.utils.dateparse import parse_datetime
+
+###############
+from .. import markup
+from ..models import Entry_Type, Publication
+
+############################################################################
+
+FIXTURE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "fixtures", "initial_entry_types.json"
+)
+
+# (value, html, latex) with the default settings
+MARKUP_CASES = [
+    (
+        "Plain text, with (parentheses) and [brackets].",
+        "Plain text, with (parentheses) and [brackets].",
+        "Plain text, with (parentheses) and [brackets].",
+    ),
+    (
+        "On *the* **theory** of {B}ayes",
+        "On <i>the</i> <b>theory</b> of Bayes",
+        "On \\textit{the} \\textbf{theory} of Bayes",
+    ),
+    (
+        "*italic {P}rotected* and **bold *nested* text**",
+        "<i>italic Protected</i> and <b>bold <i>nested</i> text</b>",
+        "\\textit{italic Protected} and \\textbf{bold \\textit{nested} text}",
+    ),
+    (
+        "Escaped \\* star, \\{braces\\} and \\\\ backslash",
+        "Escaped * star, {braces} and \\ backslash",
+        "Escaped * star, {braces} and \\ backslash",
+    ),
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        "Math $x_{1}^<i> + {y}$ stays as is</i>",
+        "Math $x_{1}^\\textit{ + {y}$ stays as is}",
+    ),
+    (
+        "Inline \\(a^{2}\\) and display \\[b\\] math",
+        "Inline \\\\(a^2\\\\) and display \\\\[b\\\\] math",
+        "Inline \\\\(a^2\\\\) and display \\\\[b\\\\] math",
+    ),
+    (
+        "Unbalanced } brace and dangling *",
+        "Unbalanced  brace and dangling ",
+        "Unbalanced  brace and dangling ",
+    ),
+    ("Trailing backslash \\", "Trailing backslash ", "Trailing backslash "),
+    ("R&D #1 & #2", "R&D #1 & #2", "R\\&D \\#1 \\& \\#2"),
+    (
+        "$\\alpha$ and $\\beta_{i}$",
+        "$\\alpha$ and $\\beta_{i}$",
+        "$\\alpha$ and $\\beta_{i}$",
+    ),
+]
+
+# (value, preserve-math-mode, inline-math-mode-rewrite, target, expected)
+MATH_CASES = [
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        True,
+        False,
+        "html",
+        "Math $x_{1}^<i> + {y}$ stays as is</i>",
+    ),
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        True,
+        False,
+        "latex",
+        "Math $x_{1}^\\textit{ + {y}$ stays as is}",
+    ),
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        True,
+        True,
+        "html",
+        "Math \\(x_{1}^<i> + {y}\\) stays as is</i>",
+    ),
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        True,
+        True,
+        "latex",
+        "Math \\(x_{1}^\\textit{ + {y}\\) stays as is}",
+    ),
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        False,
+        False,
+        "html",
+        "Math $x_{1}^<i> + {y}$ stays as is</i>",
+    ),
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        False,
+        False,
+        "latex",
+        "Math $x_{1}^\\textit{ + {y}$ stays as is}",
+    ),
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        False,
+        True,
+        "html",
+        "Math \\(x_{1}^<i> + {y}\\) stays as is</i>",
+    ),
+    (
+        "Math $x_{1}^* + \\{y\\}$ stays as is",
+        False,
+        True,
+        "latex",
+        "Math \\(x_{1}^\\textit{ + {y}\\) stays as is}",
+    ),
+    ("$\\alpha$ and $\\beta_{i}$", True, False, "html", "$\\alpha$ and $\\beta_{i}$"),
+    ("$\\alpha$ and $\\beta_{i}$", True, False, "latex", "$\\alpha$ and $\\beta_{i}$"),
+    (
+        "$\\alpha$ and $\\beta_{i}$",
+        True,
+        True,
+        "html",
+        "\\(\\alpha\\) and \\(\\beta_{i}\\)",
+    ),
+    (
+        "$\\alpha$ and $\\beta_{i}$",
+        True,
+        True,
+        "latex",
+        "\\(\\alpha\\) and \\(\\beta_{i}\\)",
+    ),
+    ("$\\alpha$ and $\\beta_{i}$", False, False, "html", "$alpha$ and $beta_{i}$"),
+    ("$\\alpha$ and $\\beta_{i}$", False, False, "latex", "$alpha$ and $beta_{i}$"),
+    (
+        "$\\alpha$ and $\\beta_{i}$",
+        False,
+        True,
+        "html",
+        "\\(alpha\\) and \\(beta_{i}\\)",
+    ),
+    (
+        "$\\alpha$ and $\\beta_{i}$",
+        False,
+        True,
+        "latex",
+        "\\(alpha\\) and \\(beta_{i}\\)",
+    ),
+    ("Odd $ count", True, False, "html", "Odd $ count"),
+    ("Odd $ count", True, False, "latex", "Odd $ count"),
+    ("Odd $ count", True, True, "html", "Odd $ count"),
+    ("Odd $ count", True, True, "latex", "Odd $ count"),
+    ("Odd $ count", False, False, "html", "Odd $ count"),
+    ("Odd $ count", False, False, "latex", "Odd $ count"),
+    ("Odd $ count", False, True, "html", "Odd $ count"),
+    ("Odd $ count", False, True, "latex", "Odd $ count"),
+]
+
+FIELD_VALUES = {
+    "author": 'Smith, J. and M{\\"u}ller, K. and others',
+    "editor": "Doe, A. and Roe, B.",
+    "title": "On *the* **theory** of {B}ayes $x_{1}^*$",
+    "journal": "J. Stat. -- X & Y",
+    "booktitle": "Proc. of *Things*",
+    "year": "2020",
+    "month": "March",
+    "volume": "12",
+    "number": "3",
+    "pages": "1--10",
+    "chapter": "4",
+    "edition": "Second",
+    "series": "Lecture Notes",
+    "publisher": "{ACM} Press",
+    "address": "New York",
+    "organization": "Org & Co.",
+    "institution": "Univ. of {M}anitoba",
+    "school": "Univ. of {M}anitoba",
+    "howpublished": "Online",
+    "note": "See \\* and \\{x\\} --- in press",
+    "type": "Technical Report",
+    "key": "k1",
+}
+
+TEMPLATE_CASES = {
+    "article": 'Smith, J.; M"uller, K. and et al.\r\n(2020, March).\r\nOn <i>the</i> <b>theory</b> of Bayes $x_{1}^**$.\r\n<i>J. Stat. – X & Y 12</i>\r\n(3),\r\n1–10.\r\nSee * and {x} — in press',
+    "book": 'Smith, J.; M"uller, K. and et al.\r\n(2020, March).\r\nOn <i>the</i> <b>theory</b> of Bayes $x_{1}^**$(Second ed.),\r\n   Volume 12 of \r\nLecture Notes.\r\nNew York: \r\nACM Press.',
+    "booklet": '<tt class="error" style="color:red;">[!] NO TEMPLATE for publication entry type: "booklet" [!]</tt>',
+    "inbook": 'Smith, J.; M"uller, K. and et al.\r\n(2020, March).\r\n<i>On <i>the</i> <b>theory</b> of Bayes $x_{1}^**$</i>, Chapter 4, pp. 1–10.\r\nACM Press.\r\n',
+    "incollection": 'Smith, J.; M"uller, K. and et al..\r\nOn <i>the</i> <b>theory</b> of Bayes $x_{1}^**$.\r\nIn Doe, A. and Roe, B., <i>Proc. of <i>Things</i></i>\r\n1–10.\r\n\r\nACM Press, \r\nNew York, \r\n2020.\r\nSee * and {x} — in press',
+    "inproceedings": 'Smith, J.; M"uller, K. and et al.\r\n(2020, March).\r\nOn <i>the</i> <b>theory</b> of Bayes $x_{1}^**$.\r\nIn Doe, A. and Roe, B., <i>Proc. of <i>Things</i></i>\r\npp. 1–10.\r\n\r\nACM Press, \r\nNew York, \r\n',
+    "manual": '<tt class="error" style="color:red;">[!] NO TEMPLATE for publication entry type: "manual" [!]</tt>',
+    "mastersthesis": '<tt class="error" style="color:red;">[!] NO TEMPLATE for publication entry type: "mastersthesis" [!]</tt>',
+    "misc": 'Smith, J.; M"uller, K. and et al.\r\n(2020, March).\r\nOn <i>the</i> <b>theory</b> of Bayes $x_{1}^**$.\r\nOnline.',
+    "phdthesis": 'Smith, J.; M"uller, K. and et al.\r\n(2020, March).\r\n<em>On <i>the</i> <b>theory</b> of Bayes $x_{1}^**$.</em>\r\nPh.&nbsp;D.&nbsp;thesis, \r\nUniv. of Manitoba, New York.\r\nSee * and {x} — in press',
+    "proceedings": "Doe, A. and Roe, B. (Ed.)\r\n\r\n(2020, March).\r\n<em>On <i>the</i> <b>theory</b> of Bayes $x_{1}^**$.</em>\r\n\r\nNew York.\r\nOrg & Co.\r\nACM Press:\r\nSee * and {x} — in press",
+    "techreport": 'Smith, J.; M"uller, K. and et al.\r\n(2020, March).\r\nOn <i>the</i> <b>theory</b> of Bayes $x_{1}^**$.\r\nTechnical Report 3.\r\nUniv. of ManitobaNew York.\r\nSee * and {x} — in press',
+    "unpublished": 'Smith, J.; M"uller, K. and et al.\r\n(2020, March).\r\nOn <i>the</i> <b>theory</b> of Bayes $x_{1}^**$.\r\nSee * and {x} — in press',
+}
+
+############################################################################
+
+
+class MarkupTests(SimpleTestCase):
+    def test_markup(self):
+        for value, html, latex in MARKUP_CASES:
+            tree = markup.parse(value)
+            self.assertEqual(markup.render(tree, "html"), html, value)
+            self.assertEqual(markup.render(tree, "latex"), latex, value)
+
+    def test_math_settings(self):
+        for value, preserve, inline, target, expected in MATH_CASES:
+            tree = markup.parse(value, preserve_math_mode=preserve)
+            self.assertEqual(
+                markup.render(tree, target, inline_math_rewrite=inline),
+                expected,
+                (value, preserve, inline, target),
+            )
+
+    def test_convert_settings(self):
+        for value, preserve, inline, target, expected in MATH_CASES:
+            config = {
+                "preserve-math-mode": preserve,
+                "inline-math-mode-rewrite": inline,
+            }
+            with override_settings(PUBLICATIONS_CONFIG=config):
+                self.assertEqual(markup.convert(value, target), expected)
+
+
+class FixtureTemplateTests(SimpleTestCase):
+    def test_fixture_templates(self):
+        with open(FIXTURE) as fp:
+            fixture = json.load(fp)
+        self.assertEqual(sorted(item["pk"] for item in fixture), sorted(TEMPLATE_CASES))
+        for item in fixture:
+            entry_type = Entry_Type(Name=item["pk"], **item["fields"])
+            entry_type.Last_Updated = parse_datetime(item["fields"]["Last_Updated"])
+            pub = Publication(Type=entry_type, **FIELD_VALUES)
+            self.assertEqual(pub.render("html"), TEMPLATE_CASES[item["pk"]], item["pk"])
+
+
+############################################################################
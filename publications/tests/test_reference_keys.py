@@ -0,0 +1,50 @@
+"""
+Tests for Reference_Key allocation (ReferenceKeyCounter).
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from people.models import Person
+
+###############
+from ..models import Publication
+
+############################################################################
+
+
+class ReferenceKeyTests(TestCase):
+    fixtures = ["initial_entry_types"]
+
+    def setUp(self):
+        self.owner = Person.objects.create(username="smith", slug="smith")
+
+    def add(self, key=None):
+        pub = Publication(
+            Owner=self.owner,
+            Type_id="misc",
+            title="A title",
+            year="2020",
+            Reference_Key=key or "",
+        )
+        pub.save()
+        return pub.Reference_Key
+
+    def test_sequence(self):
+        self.assertEqual([self.add(), self.add()], ["smith-2020-a", "smith-2020-b"])
+
+    def test_skips_keys_given_by_hand(self):
+        self.assertEqual(self.add(), "smith-2020-a")
+        self.assertEqual(self.add("smith-2020-b"), "smith-2020-b")
+        self.assertEqual(self.add(), "smith-2020-c")
+        self.assertEqual(self.add("smith-2020-f"), "smith-2020-f")
+        self.assertEqual(self.add(), "smith-2020-g")
+
+    def test_unique(self):
+        self.add("smith-2020-a")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.add("smith-2020-a")
+
+
+############################################################################
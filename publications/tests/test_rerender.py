@@ -0,0 +1,53 @@
+"""
+Tests for rebuilding the stored renderings when an Entry_Type changes.
+"""
+###############
+from __future__ import print_function, unicode_literals
+
+from django.test import TestCase, override_settings
+from people.models import Person
+
+###############
+from ..models import Entry_Type, Publication
+
+############################################################################
+
+
+class EntryTypeRerenderTests(TestCase):
+    fixtures = ["initial_entry_types"]
+
+    def setUp(self):
+        owner = Person.objects.create(username="owner", slug="owner")
+        for i in range(3):
+            Publication(
+                Owner=owner, Type_id="misc", title="Title {0}".format(i), year="2020"
+            ).save()
+        # (so a rerender shows)
+        Publication.objects.update(rendered_html="old")
+        self.entry_type = Entry_Type.objects.get(Name="misc")
+
+    def rendered(self):
+        return set(Publication.objects.values_list("rendered_html", flat=True))
+
+    def test_unchanged(self):
+        self.entry_type.Description = "Something else."
+        self.entry_type.save()
+        self.assertEqual(self.rendered(), {"old"})
+
+    def test_template_changed(self):
+        self.entry_type.html_Template = "<b>{{ title }}</b>"
+        self.entry_type.save()
+        self.assertEqual(
+            self.rendered(), {"<b>Title 0</b>", "<b>Title 1</b>", "<b>Title 2</b>"}
+        )
+
+    @override_settings(PUBLICATIONS_CONFIG={"rerender-limit": 2})
+    def test_over_limit(self):
+        self.entry_type.html_Template = "<b>{{ title }}</b>"
+        self.entry_type.save()
+        self.assertEqual(self.rendered(), {None})
+        pub = Publication.objects.order_by("pk").first()
+        self.assertEqual(pub.stored_html(), "<b>Title 0</b>")
+
+
+############################################################################
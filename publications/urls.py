@@ -7,6 +7,14 @@ from . import views
 
 urlpatterns = [
     url(r"^$", views.list_for_all, name="publications-main"),
+    url(r"^bibtex\.bib$", views.bibtex_download, name="publications-bibtex-download"),
+    url(r"^more\.json$", views.more_for_all, name="publications-more"),
+    url(r"^sitemap\.xml$", views.sitemap_index, name="publications-sitemap"),
+    url(
+        r"^sitemap-(?P<section>[\w-]+)\.xml$",
+        views.sitemap_section,
+        name="publications-sitemap-section",
+    ),
     url(r"^by-person/$", views.list_people_with_pubs, name="publications-people-list"),
     url(r"^add/$", views.add, name="publications-add"),
     url(r"^update/(?P<refkey>[\:\w-]+)/$", views.update, name="publications-edit"),
@@ -15,10 +23,30 @@ urlpatterns = [
         views.delete_view,
         name="publications-delete",
     ),
+    url(
+        r"^form-schema/(?P<version>\w+)\.js$",
+        views.form_schema,
+        name="publications-form-schema",
+    ),
     url(r"^bibtex-upload/$", views.bibtex_upload, name="publications-bibtex-upload"),
+    url(
+        r"^imports/(?P<pk>\d+)/$",
+        views.import_status,
+        name="publications-import-status",
+    ),
+    url(
+        r"^imports/(?P<pk>\d+)/status\.json$",
+        views.import_status_json,
+        name="publications-import-status-json",
+    ),
     url(
         r"^(?P<slug>[\w-]+)/$", views.list_for_person, name="publications-personal-list"
     ),
+    url(
+        r"^(?P<slug>[\w-]+)/more\.json$",
+        views.more_for_person,
+        name="publications-personal-more",
+    ),
     url(
         r"^(?P<slug>[\w-]+)/bibtex-upload/$",
         views.bibtex_upload_for_person,
@@ -29,4 +57,9 @@ urlpatterns = [
         views.bibtex_for_person,
         name="publications-personal-bibtex",
     ),
+    url(
+        r"^(?P<slug>[\w-]+)/bibtex\.bib$",
+        views.bibtex_download_for_person,
+        name="publications-personal-bibtex-download",
+    ),
 ]
@@ -1,7 +1,10 @@
+import hashlib
+import json
 import re
 import unicodedata
 
 from . import conf
+from .latexenc import CYRILLIC, translator
 
 
 def fix_reference_key(value, allow_unicode=False):
@@ -25,54 +28,119 @@ def fix_reference_key(value, allow_unicode=False):
     return re.sub(r"[-\s]+", "-", value)
 
 
+def index_to_sequence(n):
+    """
+    index_to_sequence(n) -> string
+
+    The reference key suffix for a (1-based) index:
+    1 -> "a", ..., 26 -> "z", 27 -> "aa", 28 -> "ab", ...
+    """
+    letters = []
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        letters.append(chr(ord("a") + r))
+    return "".join(reversed(letters))
+
+
+def sequence_to_index(seq):
+    """
+    sequence_to_index(seq) -> int
+
+    The inverse of index_to_sequence(); 0 for anything that is not a
+    sequence of letters.
+    """
+    seq = seq.lower()
+    if not re.match(r"[a-z]+\Z", seq):
+        return 0
+    n = 0
+    for c in seq:
+        n = n * 26 + ord(c) - ord("a") + 1
+    return n
+
+
+MONTHS = [
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+]
+
+# the year of publications with a year, but not a number (e.g., "in press")
+FORTHCOMING_YEAR = 9999
+
+
+def parse_year(value):
+    """
+    parse_year(value) -> int
+
+    The (first) four digit year in a year field, e.g., 2020 for "{2020}"
+    or "2020/21".  Values without one (e.g., "in press") are taken to be
+    forthcoming: FORTHCOMING_YEAR, so they sort as the most recent.
+    0 for a blank year.
+    """
+    value = (value or "").strip(" \t\r\n{}")
+    if not value:
+        return 0
+    match = re.search(r"(?<!\d)(\d{4})(?!\d)", value)
+    return int(match.group(1)) if match else FORTHCOMING_YEAR
+
+
+def parse_month(value):
+    """
+    parse_month(value) -> int
+
+    The month (1 to 12) of a month field: a number, or the name or
+    abbreviation of a month, e.g., "sep", "Sept." or "September";
+    0 for anything else.
+    """
+    value = (value or "").strip().lower()
+    match = re.match(r"\d{1,2}\b", value)
+    if match:
+        month = int(match.group())
+        return month if 1 <= month <= 12 else 0
+    match = re.match(r"[a-z]{3}", value)
+    if match and match.group() in MONTHS:
+        return MONTHS.index(match.group()) + 1
+    return 0
+
+
 def latex_to_unicode_cyrillic(s):
-    table = {
-        "\\cprime": "\u042c",  # soft sign
-        "\\cdprime": "\u042a",  # hard sign
-        "\\cprime": "ь",  # "soft sign"
-        "\\cdprime": "ъ",  # "hard sign"
-        "\\u{i}": "й",  # "i-kratkaya"
-        '\\"{e}': "ё",  # "yoh"
-        "\\`{e}": "э",  # "e-oborotnoye"
-        "\\`{E}": "Э",  # "E-oborotnoye"
-    }
-    for k, v in table.items():
+    for k, v in CYRILLIC.items():
         s = s.replace(k, v)
     return s
 
 
 def latex_unicode_fixes(s):
-    from bibtexparser.latexenc import latex_to_unicode
-
-    fixers = [latex_to_unicode, latex_to_unicode_cyrillic]
-
-    def _fix(s):
-        for f in fixers:
-            s = f(s)
-        return s
-
-    if conf.get("preserve-math-mode"):
-        # only fix non-math-mode parts
-        safety_map = {
-            "\\$": ":ESC:DOLLAR:",
-            "\\(": ":ESC:$:OPENMATH:",
-            "\\)": ":ESC:$:CLOSEMATH:",
-        }
-        for k, v in safety_map.items():
-            s = s.replace(k, v)
-        parts = s.split("$")
-        mathmode = False
-        fixed = []
-        for p in parts:
-            if mathmode:
-                fixed.append(p)
-            else:
-                fixed.append(_fix(p))
-            mathmode = not mathmode
-        s = "$".join(fixed)
-        for k, v in safety_map.items():
-            s = s.replace(v, k)
-        return s
+    """
+    Translate LaTeX markup in s to Unicode (only outside of math mode,
+    if the preserve-math-mode setting is on).
+    """
+    return translator(s, conf.snapshot().preserve_math_mode)
 
-    else:
-        return _fix(s)
+
+def content_fingerprint(entry_type, values):
+    """
+    content_fingerprint(entry_type, values) -> hex string
+
+    A stable hash of a publication's content: the entry type name and
+    a dictionary of field values.  Whitespace is normalized, and empty
+    values are ignored.
+    """
+    items = []
+    for name in sorted(values):
+        value = values[name]
+        if value is None:
+            continue
+        value = " ".join(unicodedata.normalize("NFC", str(value)).split())
+        if value:
+            items.append([name, value])
+    data = json.dumps([entry_type, items], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
@@ -4,20 +4,90 @@ Views for the publications app.
 Much of this is really, really dated (& written when I was new to
 Django as well), and should be rewritten.
 """
+import calendar
 import datetime
-
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+import hashlib
+from functools import wraps
+from operator import itemgetter
+
+from django.contrib.sitemaps import views as sitemap_views
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, render
 from django.template import RequestContext
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag, urlencode
 from django.views.generic.edit import DeleteView, FormView
 from django.views.generic.list import ListView
 from people.models import Person
 from uofm import auth
 
 from . import conf
+from .cache import ENTRY_TYPES, PEOPLE, PUBLICATIONS, get_version
 from .forms import BibtexUploadForm, PublicationForm
-from .models import Publication
+from .models import ImportJob, Publication, get_people_with_publications
+from .paging import clean_cursor, cursor_exists, decode_cursor, keyset_page
+from .sitemap import Publication_Sitemap
+from .similarity import drop_near_duplicates
+
+
+AUTH_CACHE_KEY = "publications:auth:{0}:{1}"
+SITEMAP_CACHE_KEY = "publications:sitemap:{0}:{1}:{2}"
+
+SITEMAPS = {"publications": Publication_Sitemap}
+
+
+def get_publication_access(user):
+    """
+    get_publication_access(user) -> (person, allowed)
+
+    The user's Person (or None), and whether the person is active with
+    the "publications" flag.  Looked up once per request (the result is
+    kept on the user object), and kept in the cache for
+    auth-cache-timeout seconds, until a person or flag changes.
+    """
+    try:
+        return user._publication_access
+    except AttributeError:
+        pass
+    timeout = conf.get("auth-cache-timeout")
+    key = AUTH_CACHE_KEY.format(get_version(PEOPLE), user.get_username())
+    access = cache.get(key) if timeout else None
+    if access is None:
+        try:
+            person = Person.objects.get_by_user(user)
+        except Person.DoesNotExist:
+            access = None, False
+        else:
+            allowed = (
+                person.active and person.flags.filter(slug="publications").exists()
+            )
+            access = person, allowed
+        if timeout:
+            cache.set(key, access, timeout)
+    user._publication_access = access
+    return access
+
+
+def get_user_person(user):
+    """
+    The user's Person (see get_publication_access); Http404 if there is
+    none.
+    """
+    person = get_publication_access(user)[0]
+    if person is None:
+        raise Http404("person does not exist")
+    return person
 
 
 def publication_auth_test(user):
@@ -29,12 +99,7 @@ def publication_auth_test(user):
         return True
     if not user.is_active:
         return False
-    try:
-        person = Person.objects.get_by_user(user, active=True)
-    except Person.DoesNotExist:
-        return False
-    else:
-        return person.flags.filter(slug="publications").count() != 0
+    return get_publication_access(user)[1]
 
 
 publication_auth = auth.user_passes_test_with_403(
@@ -42,7 +107,276 @@ publication_auth = auth.user_passes_test_with_403(
 )
 
 
-class PublicationForPersonListView(ListView):
+class RenderedListMixin(object):
+    """
+    Renders the publications of a list view in a single pass, see
+    PublicationQuerySet.render().  The template gets ``rendered_list``,
+    a list of (publication, text) pairs.
+
+    Responses carry an ETag and Last-Modified (and conditional requests
+    get a 304), computed from one aggregate query over the list and the
+    shared entry type and publication versions (see publications.cache).
+    The rendered list is cached under the same version, by viewer class:
+    see get_viewer_class().
+
+    With ``collapse_duplicates``, only the first of a group of near
+    duplicate publications (see publications.similarity) is listed.
+
+    Lists are split into pages of ``page_size`` publications (the
+    list-page-size setting by default; 0 for no pages), found by keyset
+    pagination (see publications.paging): the GET parameter ``after``
+    or ``before`` is the cursor of the last publication of the previous
+    page, or of the first publication of the next page.
+    """
+
+    render_target = "html"
+    collapse_duplicates = False
+    page_size = None
+    list_cache_key = "publications:list:{0}:{1}:{2}:{3}:{4}"
+
+    def get_queryset(self, *args, **kwargs):
+        # computed once; used for both the validators and the list.
+        if not hasattr(self, "_queryset"):
+            self._queryset = super().get_queryset(*args, **kwargs)
+        return self._queryset
+
+    def get_list_owner(self):
+        """
+        The slug of the owner of the list, or "all".
+        """
+        return "all"
+
+    def get_viewer_class(self):
+        """
+        The kind of viewer the query set was built for (e.g., the owner
+        of a list sees more than the public).
+        """
+        return "public"
+
+    def get_list_state(self):
+        """
+        Returns (version, last_modified) for the list.
+        last_modified is None for an empty list.
+        """
+        state = (
+            self.get_queryset()
+            .order_by()
+            .aggregate(last_updated=Max("Last_Updated"), count=Count("pk"))
+        )
+        last_modified = state["last_updated"]
+        version = "{0}.{1}.{2}.{3}".format(
+            get_version(ENTRY_TYPES),
+            get_version(PUBLICATIONS),
+            state["count"],
+            last_modified.isoformat() if last_modified else "",
+        )
+        return version, last_modified
+
+    def get_page_size(self):
+        if self.page_size is None:
+            return conf.get("list-page-size")
+        return self.page_size
+
+    def get_page_cursor(self):
+        """
+        Returns ("after" or "before", cursor) from the GET parameters,
+        or None for the first page.
+        """
+        for direction in ["after", "before"]:
+            cursor = self.request.GET.get(direction)
+            if cursor:
+                return direction, cursor
+        return None
+
+    def get_page_token(self):
+        """
+        A short string identifying the requested page.
+        """
+        if self.page_cursor is None:
+            return "first"
+        return hashlib.md5("=".join(self.page_cursor).encode("utf-8")).hexdigest()
+
+    def get_more_url(self):
+        """
+        The URL of the JSON view of (later) pages of this list, or None.
+        """
+        return None
+
+    def get(self, request, *args, **kwargs):
+        self.page_cursor = self.get_page_cursor()
+        if self.page_cursor is not None:
+            try:
+                self.page_values = clean_cursor(
+                    self.get_queryset(), decode_cursor(self.page_cursor[1])
+                )
+            except ValueError:
+                return HttpResponseBadRequest("Invalid page cursor")
+        self.list_version, last_modified = self.get_list_state()
+        # the page itself differs from user to user.
+        etag = quote_etag(
+            hashlib.md5(
+                ":".join(
+                    [
+                        self.list_version,
+                        self.render_target,
+                        self.get_viewer_class(),
+                        self.get_page_token(),
+                        request.user.get_username(),
+                    ]
+                ).encode("utf-8")
+            ).hexdigest()
+        )
+        if last_modified is not None:
+            last_modified = calendar.timegm(last_modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_rendered_page(self, object_list):
+        """
+        Returns (rendered list, previous cursor, next cursor) for the
+        requested page of object_list.  The cursors are None at either end
+        of the list.
+        """
+        key = self.list_cache_key.format(
+            self.list_version,
+            self.render_target,
+            self.get_list_owner(),
+            self.get_viewer_class(),
+            self.get_page_token(),
+        )
+        page = cache.get(key)
+        if page is None:
+            previous_cursor = next_cursor = None
+            page_size = self.get_page_size()
+            if page_size:
+                kwargs = {}
+                if self.page_cursor is not None:
+                    kwargs[self.page_cursor[0]] = self.page_values
+                keyset = keyset_page(object_list, page_size, **kwargs)
+                object_list = keyset.object_list
+                previous_cursor = keyset.previous_cursor
+                next_cursor = keyset.next_cursor
+            rendered_list = object_list.iter_rendered(self.render_target)
+            if self.collapse_duplicates:
+                # (within the page)
+                rendered_list = drop_near_duplicates(rendered_list, key=itemgetter(0))
+            page = list(rendered_list), previous_cursor, next_cursor
+            # any string may be given as a cursor: only those of actual
+            #   publications get cached.
+            if self.page_cursor is None or cursor_exists(
+                self.get_queryset(), self.page_values
+            ):
+                cache.set(key, page, conf.get("list-cache-timeout"))
+        return page
+
+    def get_context_data(self, **kwargs):
+        """
+        Call the base implementation first to get a context
+        """
+        context = super().get_context_data(**kwargs)
+        # Add in local context
+        rendered_list, previous_cursor, next_cursor = self.get_rendered_page(
+            context["object_list"]
+        )
+        context["rendered_list"] = rendered_list
+        context["previous_page_url"] = context["next_page_url"] = None
+        context["load_more_url"] = None
+        if previous_cursor is not None:
+            context["previous_page_url"] = "?" + urlencode({"before": previous_cursor})
+        if next_cursor is not None:
+            query = "?" + urlencode({"after": next_cursor})
+            context["next_page_url"] = query
+            more_url = self.get_more_url()
+            if more_url is not None:
+                context["load_more_url"] = more_url + query
+        return context
+
+
+class LoadMoreMixin(object):
+    """
+    A page of a list view (see RenderedListMixin) as JSON, for a "load
+    more" button: {"html": the rendered list items, "count": the number
+    of items, "next": the URL for the page after, or null}.
+    """
+
+    template_name = "publications/includes/publication_items.html"
+
+    def render_to_response(self, context, **response_kwargs):
+        html = render_to_string(self.template_name, context, request=self.request)
+        return JsonResponse(
+            {
+                "html": html,
+                "count": len(context["rendered_list"]),
+                "next": context["load_more_url"],
+            }
+        )
+
+
+class BibtexDownloadMixin(object):
+    """
+    Streams the publications of a list view as a BibTeX file.
+
+    The query set is iterated (with a server-side cursor, where the
+    database supports it), so memory use does not grow with the number of
+    publications.  It may be narrowed with the GET parameters
+    ``year_from``, ``year_to`` and ``type`` (an entry type name; may be
+    repeated).
+    """
+
+    content_type = "text/x-bibtex; charset=utf-8"
+    filename = "publications.bib"
+
+    def get_year_param(self, name):
+        """
+        Returns the given GET parameter as a year, or None.
+        Raises ValueError for values which are not years.
+        """
+        value = self.request.GET.get(name, "").strip()
+        if not value:
+            return None
+        return int(value)
+
+    def filter_queryset(self, qs):
+        year_to = self.get_year_param("year_to")
+        if year_to is not None:
+            qs = qs.filter(year_int__range=(1, year_to))
+        year_from = self.get_year_param("year_from")
+        if year_from is not None:
+            qs = qs.filter(year_int__gte=year_from)
+        types = self.request.GET.getlist("type")
+        if types:
+            qs = qs.filter(Type__in=types)
+        return qs
+
+    def get_filename(self):
+        return self.filename
+
+    def stream(self, qs):
+        for pub, text in qs.iter_rendered("bibtex"):
+            yield text + "\n\n"
+
+    def get(self, request, *args, **kwargs):
+        try:
+            qs = self.filter_queryset(self.get_queryset())
+        except ValueError:
+            return HttpResponseBadRequest("Years must be given as numbers")
+        response = StreamingHttpResponse(
+            self.stream(qs), content_type=self.content_type
+        )
+        response["Content-Disposition"] = 'attachment; filename="{0}"'.format(
+            self.get_filename()
+        )
+        return response
+
+
+class PublicationForPersonListView(RenderedListMixin, ListView):
     """
     Pulls a publication list for a particular owner, but viewable by all.
     """
@@ -63,17 +397,26 @@ class PublicationForPersonListView(ListView):
             raise Http404
         self.person = owner
 
-        show_all = owner.username == self.request.user.username
+        self.show_all = show_all = owner.username == self.request.user.username
 
         qs = (
             Publication.objects.filter(Owner=owner)
             .most_recent_order_with_key()
-            .select_related("Type", "Owner")
+            .select_related("Owner")
         )
         if not show_all:
             qs = qs.active()
         return qs
 
+    def get_list_owner(self):
+        return self.person.slug
+
+    def get_more_url(self):
+        return reverse("publications-personal-more", kwargs={"slug": self.person.slug})
+
+    def get_viewer_class(self):
+        return "owner" if self.show_all else "public"
+
     def get_context_data(self, **kwargs):
         """
         Call the base implementation first to get a context
@@ -86,15 +429,37 @@ class PublicationForPersonListView(ListView):
 
 list_for_person = PublicationForPersonListView.as_view()
 bibtex_for_person = PublicationForPersonListView.as_view(
-    template_name="publications/bibtex_list.html"
+    template_name="publications/bibtex_list.html", render_target="bibtex", page_size=0
 )
 
 
-class PublicationListView(ListView):
+class PublicationForPersonMoreView(LoadMoreMixin, PublicationForPersonListView):
+    pass
+
+
+more_for_person = PublicationForPersonMoreView.as_view()
+
+
+class PublicationForPersonBibtexView(BibtexDownloadMixin, PublicationForPersonListView):
+    """
+    A personal publication list, as a BibTeX download.
+    """
+
+    def get_filename(self):
+        return "{0}.bib".format(self.person.slug)
+
+
+bibtex_download_for_person = PublicationForPersonBibtexView.as_view()
+
+
+class PublicationListView(RenderedListMixin, ListView):
     """
     Pulls all publications, but restricts to the last few years.
+    Co-authored publications uploaded by several owners are listed once.
     """
 
+    collapse_duplicates = True
+
     def since_year(self):
         this_year = datetime.date.today().year
         return this_year - conf.get("recent_years")
@@ -102,12 +467,15 @@ class PublicationListView(ListView):
     def get_queryset(self, *args, **kwargs):
         return (
             Publication.objects.active()
-            .filter(Owner__active=True, year__gte=self.since_year())
+            .filter(Owner__active=True, year_int__gte=self.since_year())
             .most_recent_order()
             .public()
-            .select_related("Type", "Owner")
+            .select_related("Owner")
         )
 
+    def get_more_url(self):
+        return reverse("publications-more")
+
     def get_context_data(self, **kwargs):
         """
         Call the base implementation first to get a context
@@ -122,12 +490,49 @@ class PublicationListView(ListView):
 
 list_for_all = PublicationListView.as_view()
 
-list_people_with_pubs = ListView.as_view(
-    queryset=Person.objects.filter(
-        active=True, slug__isnull=False, flags__slug="publications"
-    ),
-    template_name="publications/person_list.html",
-)
+
+class PublicationListMoreView(LoadMoreMixin, PublicationListView):
+    pass
+
+
+more_for_all = PublicationListMoreView.as_view()
+
+
+class PublicationListBibtexView(BibtexDownloadMixin, PublicationListView):
+    """
+    The department publication list, as a BibTeX download.
+    By default only recent publications are included, as in the list;
+    ``year_from`` replaces that limit.
+    """
+
+    def since_year(self):
+        year_from = self.get_year_param("year_from")
+        if year_from is not None:
+            return year_from
+        return super().since_year()
+
+
+bibtex_download = PublicationListBibtexView.as_view()
+
+
+class PeopleWithPublicationsView(ListView):
+    """
+    The active people with the "publications" flag, with the number of
+    their active publications (see get_people_with_publications).
+    """
+
+    template_name = "publications/person_list.html"
+    context_object_name = "person_list"
+
+    def get_queryset(self):
+        return [
+            person
+            for person in get_people_with_publications()
+            if person.active and person.slug and person.publications_flag
+        ]
+
+
+list_people_with_pubs = PeopleWithPublicationsView.as_view()
 
 
 @publication_auth
@@ -135,7 +540,7 @@ def add(request):
     """
     Add a new publication
     """
-    person = Person.objects.get_by_user(request.user)
+    person = get_user_person(request.user)
 
     if request.method == "POST":  # form submission
         form = PublicationForm(request.POST)
@@ -165,7 +570,7 @@ def update(request, refkey):
     """
     Update the given publication
     """
-    person = Person.objects.get_by_user(request.user)
+    person = get_user_person(request.user)
     update_pub = get_object_or_404(Publication, Reference_Key=refkey, Owner=person)
 
     if request.method == "POST":  # form submission
@@ -201,11 +606,32 @@ def update(request, refkey):
     )  # warning: template does not exist!
 
 
+def form_schema(request, version):
+    """
+    The publication form's rules for each entry type, as javascript.
+    The URL names the schema version, so browsers may keep it for long;
+    a stale version redirects to the current one.
+    """
+    current = PublicationForm.schema_version()
+    if version != current:
+        return HttpResponseRedirect(
+            reverse("publications-form-schema", kwargs={"version": current})
+        )
+    etag = quote_etag(current)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            PublicationForm.schema_javascript(),
+            content_type="application/javascript; charset=utf-8",
+        )
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=conf.get("form-schema-max-age"))
+    return response
+
+
 class PublicationDeleteView(DeleteView):
     def get_person(self):
-        if not hasattr(self, "person"):
-            self.person = Person.objects.get_by_user(self.request.user)
-        return self.person
+        return get_user_person(self.request.user)
 
     def get_object(self, *args, **kwargs):
 
@@ -242,10 +668,7 @@ class BibtexUploadFormView(FormView):
     template_name = "publications/bibtex_upload.html"
 
     def get_person(self):
-        try:
-            return Person.objects.get_by_user(self.request.user)
-        except Person.DoesNotExist:
-            raise Http404("person does not exist")
+        return get_user_person(self.request.user)
 
     def get_form_kwargs(self, *args, **kwargs):
         """
@@ -279,6 +702,9 @@ class BibtexUploadFormView(FormView):
         """
         Called when the form is valid: Do an action.
         """
+        if conf.get("async-import"):
+            job = form.enqueue(self.get_person(), self.request.user)
+            return HttpResponseRedirect(job.get_absolute_url())
         if form.save_bibtex(self.get_person()):
             return super(BibtexUploadFormView, self).form_valid(form)
         else:
@@ -312,3 +738,88 @@ class BibtexUploadForPersonFormView(BibtexUploadFormView):
 #
 
 bibtex_upload_for_person = publication_auth(BibtexUploadForPersonFormView.as_view())
+
+
+def get_import_job(request, pk):
+    """
+    The import job, if the user may see it: the uploader, the owner of the
+    publications, or a superuser.
+    """
+    job = get_object_or_404(ImportJob.objects.select_related("owner"), pk=pk)
+    user = request.user
+    if not (
+        user.is_superuser
+        or job.user_id == user.pk
+        or job.owner.username == user.get_username()
+    ):
+        raise Http404("No such import")
+    return job
+
+
+@publication_auth
+def import_status(request, pk):
+    """
+    The progress (and errors) of a BibTeX import job.
+    """
+    job = get_import_job(request, pk)
+    return render(
+        request,
+        "publications/import_status.html",
+        {"job": job, "person": job.owner, "errors": job.get_errors()},
+    )
+
+
+@publication_auth
+def import_status_json(request, pk):
+    """
+    The progress (and errors) of a BibTeX import job, as JSON.
+    """
+    return JsonResponse(get_import_job(request, pk).as_dict())
+
+
+def cached_sitemap(view):
+    """
+    Cache the XML of a sitemap view until a publication or person
+    changes.  The XML has absolute URLs, so the key includes the scheme
+    and host, as well as the path and page.
+    """
+
+    @sitemap_views.x_robots_tag
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        key = SITEMAP_CACHE_KEY.format(
+            get_version(PUBLICATIONS),
+            get_version(PEOPLE),
+            hashlib.md5(request.build_absolute_uri().encode("utf-8")).hexdigest(),
+        )
+        cached = cache.get(key)
+        if cached is None:
+            response = view(request, *args, **kwargs)
+            response.render()
+            cached = response.content, response.get("Last-Modified")
+            cache.set(key, cached, conf.get("list-cache-timeout"))
+        content, last_modified = cached
+        response = HttpResponse(content, content_type="application/xml")
+        if last_modified is not None:
+            response["Last-Modified"] = last_modified
+        return response
+
+    return inner
+
+
+@cached_sitemap
+def sitemap_index(request):
+    """
+    The sitemap index: the URL of each page of the sitemap.
+    """
+    return sitemap_views.index(
+        request, SITEMAPS, sitemap_url_name="publications-sitemap-section"
+    )
+
+
+@cached_sitemap
+def sitemap_section(request, section):
+    """
+    A page of the sitemap (given by the GET parameter ``p``).
+    """
+    return sitemap_views.sitemap(request, SITEMAPS, section=section)